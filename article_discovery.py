@@ -6,16 +6,17 @@ Reddit is handled separately by reddit_discovery.py
 """
 
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 from dotenv import load_dotenv
 import os
-import requests
 import xml.etree.ElementTree as ET
 import re
-import time
 from datetime import datetime, timedelta
 from urllib.parse import urlparse
-from bs4 import BeautifulSoup
+from fetch_engine import fetch_all
+from feed_cache import fetch_feed
+from page_metadata import extract_thumbnail, extract_thumbnails
+from db_bulk import existing_urls, save_content_items
 
 # Google News URL decoder
 try:
@@ -112,22 +113,20 @@ class ArticleDiscovery:
     def fetch_rss_feed(self, feed_url, feed_name):
         articles = []
         try:
-            response = requests.get(feed_url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            root = ET.fromstring(response.content)
-            
-            items = root.findall('.//item') or root.findall('.//{http://www.w3.org/2005/Atom}entry')
-            
-            if not items:
-                print(f"      ⚠️ No items found in feed (might be wrong URL format)")
-            
-            for item in items:
-                article = self._parse_rss_item(item, feed_name)
-                if article:
-                    articles.append(article)
+            # Unchanged feeds come back from the feed cache without re-parsing
+            articles, status = fetch_feed(
+                feed_url,
+                lambda content: self._parse_feed(content, feed_name),
+                headers=self.headers,
+                timeout=10,
+            )
+            for article in articles:
+                if isinstance(article['published_date'], str):
+                    article['published_date'] = datetime.fromisoformat(article['published_date'])
             
             if articles:
-                print(f"      Found {len(articles)} articles")
+                cached_note = "" if status == 'fetched' else " (unchanged, cached)"
+                print(f"      {feed_name}: found {len(articles)} articles{cached_note}")
                 
         except ET.ParseError as e:
             print(f"      ❌ XML parse error for {feed_name}: {e} (URL might not be an RSS feed)")
@@ -135,6 +134,23 @@ class ArticleDiscovery:
             print(f"      ❌ Error fetching {feed_name}: {e}")
         return articles
     
+    def _parse_feed(self, content, feed_name):
+        root = ET.fromstring(content)
+        
+        items = root.findall('.//item') or root.findall('.//{http://www.w3.org/2005/Atom}entry')
+        
+        if not items:
+            print(f"      ⚠️ No items found in {feed_name} feed (might be wrong URL format)")
+        
+        articles = []
+        for item in items:
+            article = self._parse_rss_item(item, feed_name)
+            if article:
+                # Stored as JSON in the feed cache
+                article['published_date'] = article['published_date'].isoformat()
+                articles.append(article)
+        return articles
+    
     def _parse_rss_item(self, item, feed_name):
         try:
             title = self._get_text(item, 'title') or self._get_text(item, '{http://www.w3.org/2005/Atom}title')
@@ -195,33 +211,11 @@ class ArticleDiscovery:
     
     def extract_thumbnail(self, url):
         """Extract thumbnail from article page using og:image or twitter:image meta tags."""
-        try:
-            response = requests.get(url, headers=self.headers, timeout=10, allow_redirects=True)
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # Try og:image first (most common)
-            og = soup.find('meta', property='og:image')
-            if og and og.get('content'):
-                img_url = og.get('content')
-                # Skip placeholder/icon images
-                if not any(skip in img_url.lower() for skip in ['logo', 'icon', 'favicon', '1x1', 'placeholder']):
-                    return img_url
-
-            # Try twitter:image
-            tw = soup.find('meta', attrs={'name': 'twitter:image'})
-            if tw and tw.get('content'):
-                img_url = tw.get('content')
-                if not any(skip in img_url.lower() for skip in ['logo', 'icon', 'favicon', '1x1', 'placeholder']):
-                    return img_url
-
-            # Try twitter:image:src (some sites use this)
-            tw_src = soup.find('meta', attrs={'name': 'twitter:image:src'})
-            if tw_src and tw_src.get('content'):
-                return tw_src.get('content')
-
-        except Exception as e:
-            pass
-        return ''
+        return extract_thumbnail(url, headers=self.headers) or ''
+    
+    def extract_thumbnails(self, urls):
+        """Thumbnails for many article pages in parallel ({url: thumbnail or ''})."""
+        return {url: thumbnail or '' for url, thumbnail in extract_thumbnails(urls, headers=self.headers).items()}
 
 
 class ArticleDatabaseManager:
@@ -230,6 +224,7 @@ class ArticleDatabaseManager:
         self.cursor = None
         self.creator_columns = []
         self.content_columns = []
+        self.creator_ids = {}  # source name -> id, per run
     
     def connect(self):
         self.conn = psycopg2.connect(**DB_CONFIG)
@@ -246,9 +241,12 @@ class ArticleDatabaseManager:
         if self.conn: self.conn.commit(); self.conn.close()
     
     def get_or_create_creator(self, source_name):
+        if source_name in self.creator_ids: return self.creator_ids[source_name]
         self.cursor.execute("SELECT id FROM creators WHERE name = %s AND platform = 'article'", (source_name,))
         result = self.cursor.fetchone()
-        if result: return result['id']
+        if result:
+            self.creator_ids[source_name] = result['id']
+            return result['id']
         
         cols, vals = ['name', 'platform'], [source_name, 'article']
         if 'platform_id' in self.creator_columns: cols.append('platform_id'); vals.append(source_name)
@@ -257,28 +255,43 @@ class ArticleDatabaseManager:
             vals.append(0.7 if any(s in source_name.lower() for s in ['hyrox', 'barbend', 'boxrox']) else 0.5)
         
         self.cursor.execute(f"INSERT INTO creators ({','.join(cols)}) VALUES ({','.join(['%s']*len(vals))}) RETURNING id", vals)
-        self.conn.commit()
-        return self.cursor.fetchone()['id']
+        self.creator_ids[source_name] = self.cursor.fetchone()['id']
+        return self.creator_ids[source_name]
     
     def article_exists(self, url):
-        self.cursor.execute("SELECT id FROM content_items WHERE url = %s", (url,))
-        return self.cursor.fetchone() is not None
+        return url in existing_urls(self.cursor, [url])
 
     def get_article_needing_thumbnail(self, url):
         """Check if article exists and needs thumbnail update."""
-        self.cursor.execute("SELECT id, thumbnail_url FROM content_items WHERE url = %s", (url,))
-        result = self.cursor.fetchone()
-        if not result:
-            return None, False
-        thumbnail = result.get('thumbnail_url') or ''
-        # Needs update if no thumbnail or has Google placeholder thumbnail
-        is_google_placeholder = 'lh3.googleusercontent.com' in thumbnail
-        needs_update = not thumbnail or is_google_placeholder
-        return result['id'], needs_update
+        return self.get_articles_needing_thumbnails([url]).get(url, (None, False))
+
+    def get_articles_needing_thumbnails(self, urls):
+        """Dedup index for a batch: {url: (id, needs_thumbnail)} for urls already saved, in one query."""
+        urls = list(dict.fromkeys(u for u in urls if u))
+        if not urls:
+            return {}
+        self.cursor.execute("SELECT id, url, thumbnail_url FROM content_items WHERE url = ANY(%s)", (urls,))
+        statuses = {}
+        for result in self.cursor.fetchall():
+            thumbnail = result.get('thumbnail_url') or ''
+            # Needs update if no thumbnail or has Google placeholder thumbnail
+            is_google_placeholder = 'lh3.googleusercontent.com' in thumbnail
+            statuses[result['url']] = (result['id'], not thumbnail or is_google_placeholder)
+        return statuses
 
     def update_thumbnail(self, article_id, thumbnail_url):
         """Update thumbnail for existing article."""
-        self.cursor.execute("UPDATE content_items SET thumbnail_url = %s WHERE id = %s", (thumbnail_url, article_id))
+        self.update_thumbnails([(article_id, thumbnail_url)])
+
+    def update_thumbnails(self, updates):
+        """Update thumbnails for many existing articles in one statement ([(id, thumbnail_url)])."""
+        if not updates:
+            return
+        execute_values(self.cursor, """
+            UPDATE content_items SET thumbnail_url = v.thumbnail_url
+            FROM (VALUES %s) AS v(id, thumbnail_url)
+            WHERE content_items.id = v.id
+        """, updates)
         self.conn.commit()
 
     def update_article_url_and_thumbnail(self, article_id, new_url, thumbnail_url):
@@ -297,22 +310,31 @@ class ArticleDatabaseManager:
         """)
         return self.cursor.fetchall()
     
-    def save_article(self, article, creator_id, category='other'):
-        cols = ['title', 'url', 'platform', 'creator_id', 'status']
-        vals = [article['title'], article['url'], 'article', creator_id, 'discovered']
+    def _article_row(self, article, creator_id, category='other'):
+        row = {'title': article['title'], 'url': article['url'], 'platform': 'article',
+               'creator_id': creator_id, 'status': 'discovered'}
         
-        if 'thumbnail_url' in self.content_columns: cols.append('thumbnail_url'); vals.append(article.get('thumbnail_url', ''))
-        if 'description' in self.content_columns: cols.append('description'); vals.append(article.get('description', ''))
-        if 'published_date' in self.content_columns: cols.append('published_date'); vals.append(article.get('published_date'))
-        if 'view_count' in self.content_columns: cols.append('view_count'); vals.append(0)
-        if 'like_count' in self.content_columns: cols.append('like_count'); vals.append(0)
-        if 'comment_count' in self.content_columns: cols.append('comment_count'); vals.append(0)
-        if 'category' in self.content_columns: cols.append('category'); vals.append(category)
-        if 'editorial_note' in self.content_columns: cols.append('editorial_note'); vals.append(f"Source: {article.get('source', 'Web')}")
+        if 'thumbnail_url' in self.content_columns: row['thumbnail_url'] = article.get('thumbnail_url', '')
+        if 'description' in self.content_columns: row['description'] = article.get('description', '')
+        if 'published_date' in self.content_columns: row['published_date'] = article.get('published_date')
+        if 'view_count' in self.content_columns: row['view_count'] = 0
+        if 'like_count' in self.content_columns: row['like_count'] = 0
+        if 'comment_count' in self.content_columns: row['comment_count'] = 0
+        if 'category' in self.content_columns: row['category'] = category
+        if 'editorial_note' in self.content_columns: row['editorial_note'] = f"Source: {article.get('source', 'Web')}"
+        return row
+    
+    def save_article(self, article, creator_id, category='other'):
+        return self.save_articles([(article, creator_id, category)]).get(article['url'])
+    
+    def save_articles(self, entries):
+        """Insert many articles in one transaction ([(article, creator_id, category)]).
         
-        self.cursor.execute(f"INSERT INTO content_items ({','.join(cols)}) VALUES ({','.join(['%s']*len(vals))}) RETURNING id", vals)
-        self.conn.commit()
-        return self.cursor.fetchone()['id']
+        A failed batch is retried row by row, so a bad row only loses itself.
+        Returns {url: id} for the articles inserted (existing urls are skipped).
+        """
+        rows = [self._article_row(article, creator_id, category) for article, creator_id, category in entries]
+        return save_content_items(self.conn, self.cursor, rows)
 
 
 def is_hyrox_relevant(article):
@@ -351,12 +373,19 @@ def get_priority_article_sources():
         return []
 
 
-def main():
+def main(week_start=None, week_end=None):
+    """Run article discovery and return a summary dict (found/saved/updated/skipped)
+
+    week_end is exclusive; anything left as None falls back to the environment.
+    """
+    week_start = week_start or WEEK_START
+    week_end = week_end or WEEK_END
+
     print("=" * 70)
     print("ARTICLE DISCOVERY - Hyrox Content (RSS Feeds)")
     print("=" * 70)
     
-    print(f"\n📅 Week: {WEEK_START.strftime('%Y-%m-%d')} to {WEEK_END.strftime('%Y-%m-%d')}")
+    print(f"\n📅 Week: {week_start.strftime('%Y-%m-%d')} to {week_end.strftime('%Y-%m-%d')}")
     
     discovery = ArticleDiscovery()
     db = ArticleDatabaseManager()
@@ -398,16 +427,22 @@ def main():
     
     print("\n📥 Fetching RSS feeds...")
     for feed in feeds_to_check:
-        is_priority = feed.get('is_priority', False)
-        prefix = "⭐" if is_priority else "  "
+        prefix = "⭐" if feed.get('is_priority') else "  "
         print(f"{prefix} -> {feed['name']}...")
-        articles = discovery.fetch_rss_feed(feed['url'], feed['name'])
+
+    # Feeds are independent - fetch in parallel, rate limited per host
+    feed_results = fetch_all(
+        lambda feed: discovery.fetch_rss_feed(feed['url'], feed['name']),
+        feeds_to_check,
+        host=lambda feed: feed['url'],
+    )
+    for feed, articles in zip(feeds_to_check, feed_results):
+        is_priority = feed.get('is_priority', False)
         for a in articles:
             a['default_category'] = feed.get('category', 'other')
             a['is_priority'] = is_priority  # Mark articles from priority sources
             a['skip_relevance_check'] = feed.get('skip_relevance_check', False)  # Google News already filtered
         all_articles.extend(articles)
-        time.sleep(0.3)
     
     print(f"   Found {len(all_articles)} articles from RSS feeds")
     
@@ -417,7 +452,7 @@ def main():
     print(f"   {len(unique)} unique articles")
     
     # Filter to selected week
-    recent = [a for a in unique if WEEK_START <= a.get('published_date', datetime.now()) <= WEEK_END]
+    recent = [a for a in unique if week_start <= a.get('published_date', datetime.now()) <= week_end]
     print(f"   {len(recent)} from selected week")
     
     # Filter relevant - some sources bypass relevance check
@@ -437,7 +472,7 @@ def main():
     if not relevant:
         print("\n   No Hyrox-relevant articles found this week.")
         print("   (This is normal - not every week has Hyrox coverage)")
-        return
+        return {'found': 0, 'saved': 0, 'updated': 0, 'skipped': 0}
 
     print(f"\n💾 Saving {len(relevant)} articles...")
 
@@ -453,18 +488,26 @@ def main():
 
     db.connect()
 
-    saved, skipped, updated = 0, 0, 0
-    for article in relevant:
-        # Check if article exists and needs thumbnail update
-        article_id, needs_thumbnail = db.get_article_needing_thumbnail(article['url'])
+    # Check which articles exist / need thumbnails, then fetch all thumbnails in one parallel pass
+    known = db.get_articles_needing_thumbnails([article['url'] for article in relevant])
+    statuses = [known.get(article['url'], (None, False)) for article in relevant]
+    thumbnail_urls = [
+        article['url'] for article, (article_id, needs_thumbnail) in zip(relevant, statuses)
+        if (article_id and needs_thumbnail) or (not article_id and not article.get('thumbnail_url'))
+    ]
+    if thumbnail_urls:
+        print(f"   🖼️ Fetching {len(thumbnail_urls)} thumbnails...")
+    thumbnails = discovery.extract_thumbnails(thumbnail_urls)
 
+    saved, skipped, updated = 0, 0, 0
+    thumbnail_updates = []
+    to_save = []
+    for article, (article_id, needs_thumbnail) in zip(relevant, statuses):
         if article_id and needs_thumbnail:
             # Update thumbnail for existing article
-            print(f"      Updating thumbnail for: {article['title'][:40]}...")
-            thumbnail = discovery.extract_thumbnail(article['url'])
+            thumbnail = thumbnails.get(article['url'], '')
             if thumbnail:
-                db.update_thumbnail(article_id, thumbnail)
-                updated += 1
+                thumbnail_updates.append((article_id, thumbnail))
                 print(f"   🔄 Updated: {article['title'][:50]}...")
             continue
         elif article_id:
@@ -474,17 +517,30 @@ def main():
 
         creator_id = db.get_or_create_creator(article['source'])
 
-        # Fetch thumbnail from article page
+        # Thumbnail from article page
         if not article.get('thumbnail_url'):
-            print(f"      Fetching thumbnail for: {article['title'][:40]}...")
-            article['thumbnail_url'] = discovery.extract_thumbnail(article['url'])
+            article['thumbnail_url'] = thumbnails.get(article['url'], '')
 
-        try:
-            db.save_article(article, creator_id, article.get('default_category', 'other'))
-            saved += 1
-            print(f"   ✅ Saved: {article['title'][:50]}...")
-        except Exception as e:
-            print(f"   ❌ Error: {e}")
+        to_save.append((article, creator_id, article.get('default_category', 'other')))
+
+    try:
+        db.update_thumbnails(thumbnail_updates)
+        updated = len(thumbnail_updates)
+    except Exception as e:
+        db.conn.rollback()
+        print(f"   ❌ Error updating thumbnails: {e}")
+
+    # Write the whole batch in one transaction
+    try:
+        inserted = db.save_articles(to_save)
+        for article, _, _ in to_save:
+            if article['url'] in inserted:
+                saved += 1
+                print(f"   ✅ Saved: {article['title'][:50]}...")
+            else:
+                skipped += 1
+    except Exception as e:
+        print(f"   ❌ Error: {e}")
     
     db.close()
 
@@ -500,10 +556,13 @@ def main():
 
         if google_articles:
             print(f"   Found {len(google_articles)} articles with Google News URLs to fix")
+            decoded_urls = [decode_google_news_url(article['url']) for article in google_articles]
+            fix_thumbnails = discovery.extract_thumbnails(
+                [decoded for article, decoded in zip(google_articles, decoded_urls) if decoded != article['url']]
+            )
             fixed, deleted = 0, 0
-            for article in google_articles:
+            for article, decoded_url in zip(google_articles, decoded_urls):
                 try:
-                    decoded_url = decode_google_news_url(article['url'])
                     if decoded_url != article['url']:
                         # Check if the decoded URL already exists (duplicate)
                         db.cursor.execute("SELECT id FROM content_items WHERE url = %s", (decoded_url,))
@@ -516,7 +575,7 @@ def main():
                             deleted += 1
                         else:
                             # Update the old article with decoded URL and thumbnail
-                            thumbnail = discovery.extract_thumbnail(decoded_url)
+                            thumbnail = fix_thumbnails.get(decoded_url, '')
                             if thumbnail:
                                 db.update_article_url_and_thumbnail(article['id'], decoded_url, thumbnail)
                                 fixed += 1
@@ -531,6 +590,8 @@ def main():
 
         db.close()
 
+    return {'found': len(relevant), 'saved': saved, 'updated': updated, 'skipped': skipped}
+
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,461 @@
+"""
+Hyrox Weekly - AI Blurb Pipeline
+
+Generates newsletter blurbs with Claude for many items at once: one shared
+Anthropic client, a bounded worker pool whose concurrency adapts to the API's
+anthropic-ratelimit-* headers, and retries on transient errors (429, 5xx,
+overloaded, connection errors) with jittered backoff honouring retry-after.
+
+Blurbs are cached on disk by a hash of everything that shapes them (platform,
+title, description, creator, prompt version, model), so unchanged items are
+never sent twice - across reruns, regenerations and premium pages alike.
+Bump PROMPT_VERSION whenever the prompt changes.
+
+Cache misses are sent BLURB_BATCH_SIZE at a time in one request that shares
+the instruction block and returns a JSON array of blurbs keyed by item id;
+items whose blurb is missing or over the length limit are retried on their own.
+
+Set ANTHROPIC_BASE_URL to point the client at a local stub server (any
+ANTHROPIC_API_KEY value then works).
+
+Usage:
+    from blurb_pipeline import generate_blurb, generate_blurbs
+
+    blurb, error = generate_blurb(title, description, 'youtube', creator_name)
+    blurb, error = generate_blurb(title, description, 'youtube', refresh=True)  # skip the cache
+    results = generate_blurbs(items)   # {item id: (blurb, error)}
+"""
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+from dotenv import load_dotenv
+
+from disk_cache import DiskCache, MISSING
+
+try:
+    import anthropic
+except ImportError:
+    anthropic = None
+
+load_dotenv()
+
+ANTHROPIC_API_KEY = os.getenv('ANTHROPIC_API_KEY')
+# Unset means the real API
+ANTHROPIC_BASE_URL = os.getenv('ANTHROPIC_BASE_URL') or None
+
+BLURB_MODEL = os.getenv('BLURB_MODEL', 'claude-3-5-haiku-20241022')
+BLURB_MAX_TOKENS = 100
+
+# Items per batched request (1 sends every item on its own)
+BLURB_BATCH_SIZE = int(os.getenv('BLURB_BATCH_SIZE', '10'))
+# Output allowance per item in a batch: the blurb plus its JSON wrapping
+BATCH_TOKENS_PER_ITEM = BLURB_MAX_TOKENS + 30
+
+# Requests in flight at most; lowered automatically while the API is throttling
+BLURB_CONCURRENCY = int(os.getenv('BLURB_CONCURRENCY', '8'))
+# Attempts after the first one, for transient failures
+BLURB_MAX_RETRIES = int(os.getenv('BLURB_MAX_RETRIES', '4'))
+BLURB_TIMEOUT = float(os.getenv('BLURB_TIMEOUT', '30'))
+BACKOFF_BASE = 1.0
+MAX_RETRY_WAIT = 60
+
+# Part of every cache key: bump when build_prompt's wording changes
+PROMPT_VERSION = 1
+BLURB_CACHE_TTL = int(os.getenv('BLURB_CACHE_TTL_DAYS', '180')) * 86400
+# Only this much of the description is sent, so only this much is keyed
+DESCRIPTION_CHARS = 1000
+
+# Asked for in the prompt / enforced on the result (newsletter display limit)
+BLURB_TARGET_LENGTH = 230
+BLURB_MAX_LENGTH = 250
+
+# 529 is Anthropic's "overloaded"
+TRANSIENT_STATUSES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+PLATFORM_CONTEXT = {
+    'youtube': 'YouTube video',
+    'podcast': 'podcast episode',
+    'article': 'article',
+    'reddit': 'Reddit discussion'
+}
+
+_client = None
+_client_lock = threading.Lock()
+
+_cache = DiskCache('blurbs')
+
+
+def get_client():
+    """The shared Anthropic client (retries are handled here, not by the SDK)"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = anthropic.Anthropic(
+                api_key=ANTHROPIC_API_KEY,
+                base_url=ANTHROPIC_BASE_URL,
+                max_retries=0,
+                timeout=BLURB_TIMEOUT,
+            )
+        return _client
+
+
+BLURB_REQUIREMENTS = f"""Requirements:
+- STRICT LIMIT: Keep under {BLURB_TARGET_LENGTH} characters (about 1-2 short sentences)
+- Write in a crisp, professional sports journalism style (think Sports Illustrated)
+- Be informative and direct - no hype or exaggeration
+- Avoid words like: epic, amazing, incredible, ultimate, game-changer, crushing it, insane
+- Assume readers already know what Hyrox is - no need to explain the sport
+- Focus on the specific value: what will readers learn or gain?
+- Do not use quotation marks around the blurb
+- Do not start with "This video..." or "In this episode..."
+"""
+
+
+def _subject(platform, creator_name):
+    platform_context = PLATFORM_CONTEXT.get(platform, 'content')
+    creator_info = f" by {creator_name}" if creator_name else ""
+    return f"{platform_context}{creator_info}"
+
+
+def _details(title, description):
+    return f"""Title: {title}
+
+Original Description: {description[:DESCRIPTION_CHARS] if description else 'No description available'}"""
+
+
+def build_prompt(title, description, platform, creator_name=None):
+    return f"""Write a brief blurb for this {_subject(platform, creator_name)} for a Hyrox fitness newsletter.
+
+{_details(title, description)}
+
+{BLURB_REQUIREMENTS}
+Just return the blurb text, nothing else."""
+
+
+def build_batch_prompt(items):
+    """One prompt for several items; the answer is a JSON array of {"id", "blurb"}"""
+    sections = '\n\n'.join(
+        f"""### Item {item['id']} ({_subject(item.get('platform'), item.get('creator_name'))})
+
+{_details(item.get('title', ''), item.get('description', ''))}"""
+        for item in items
+    )
+    return f"""Write a brief blurb for each of these {len(items)} items for a Hyrox fitness newsletter.
+
+{sections}
+
+{BLURB_REQUIREMENTS}
+These apply to each blurb separately. Return only a JSON array with one object per item,
+in the form [{{"id": "<item id>", "blurb": "<blurb text>"}}], nothing else."""
+
+
+def parse_batch(text):
+    """{str(item id): blurb} from a batched answer; {} if it isn't a JSON array"""
+    start, end = text.find('['), text.rfind(']')
+    if start < 0 or end < start:
+        return {}
+    try:
+        entries = json.loads(text[start:end + 1])
+    except ValueError:
+        return {}
+    if not isinstance(entries, list):
+        return {}
+    return {
+        str(entry['id']): entry['blurb']
+        for entry in entries
+        if isinstance(entry, dict) and 'id' in entry and isinstance(entry.get('blurb'), str)
+    }
+
+
+def valid_blurb(blurb):
+    """Whether a batched blurb can be used as-is (non-empty and within BLURB_MAX_LENGTH)"""
+    return isinstance(blurb, str) and 0 < len(blurb.strip()) <= BLURB_MAX_LENGTH
+
+
+def blurb_key(title, description, platform, creator_name=None):
+    """Content address of a blurb: hash of the prompt inputs, prompt version and model"""
+    parts = [
+        platform or '',
+        title or '',
+        (description or '')[:DESCRIPTION_CHARS],
+        creator_name or '',
+        PROMPT_VERSION,
+        BLURB_MODEL,
+    ]
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def clamp_blurb(blurb):
+    """Keep a blurb within BLURB_MAX_LENGTH, cutting at the last sentence or word"""
+    blurb = blurb.strip()
+    if len(blurb) <= BLURB_MAX_LENGTH:
+        return blurb
+    truncated = blurb[:BLURB_MAX_LENGTH - 3]
+    last_period = truncated.rfind('.')
+    last_space = truncated.rfind(' ')
+    if last_period > 180:
+        return truncated[:last_period + 1]
+    if last_space > 200:
+        return truncated[:last_space] + '...'
+    return truncated + '...'
+
+
+def _header_int(headers, name):
+    try:
+        return int(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+def _seconds_until(value):
+    """Seconds until an RFC 3339 reset timestamp (anthropic-ratelimit-*-reset), or None"""
+    if not value:
+        return None
+    try:
+        reset = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if reset.tzinfo is None:
+        reset = reset.replace(tzinfo=timezone.utc)
+    return max(0.0, (reset - datetime.now(timezone.utc)).total_seconds())
+
+
+def _retry_after(headers):
+    try:
+        return max(0.0, float(headers.get('retry-after')))
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff(attempt):
+    """Full-jitter exponential backoff"""
+    return random.uniform(0, BACKOFF_BASE * (2 ** attempt))
+
+
+class RateGate:
+    """Concurrency limit that shrinks when the API throttles and regrows as calls succeed"""
+
+    LIMIT_HEADERS = ('requests', 'tokens', 'input-tokens', 'output-tokens')
+
+    def __init__(self, max_concurrency=BLURB_CONCURRENCY):
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = self.max_concurrency
+        self.active = 0
+        self.resume_at = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while True:
+                wait = self.resume_at - time.monotonic()
+                if wait <= 0 and self.active < self.limit:
+                    self.active += 1
+                    return
+                self._cond.wait(timeout=wait if wait > 0 else None)
+
+    def release(self):
+        with self._cond:
+            self.active -= 1
+            self._cond.notify_all()
+
+    def pause(self, seconds):
+        with self._cond:
+            self.resume_at = max(self.resume_at, time.monotonic() + seconds)
+            self._cond.notify_all()
+
+    def throttled(self, seconds):
+        """A 429: halve the concurrency and hold every worker back for `seconds`"""
+        with self._cond:
+            self.limit = max(1, self.limit // 2)
+        self.pause(seconds)
+
+    def observe(self, headers):
+        """Adapt to the rate-limit headers of a successful response"""
+        pause = 0.0
+        tight = False
+        for kind in self.LIMIT_HEADERS:
+            remaining = _header_int(headers, f'anthropic-ratelimit-{kind}-remaining')
+            if remaining is None:
+                continue
+            if remaining == 0:
+                pause = max(pause, _seconds_until(headers.get(f'anthropic-ratelimit-{kind}-reset')) or 1.0)
+            elif kind == 'requests' and remaining < self.limit:
+                tight = True
+        with self._cond:
+            if pause or tight:
+                self.limit = max(1, self.limit - 1)
+            elif self.limit < self.max_concurrency:
+                self.limit += 1
+                self._cond.notify_all()
+        if pause:
+            self.pause(min(pause, MAX_RETRY_WAIT))
+
+
+_gate = RateGate()
+
+
+def _create(prompt, max_tokens):
+    """One Messages call; returns (response headers, response text)"""
+    raw = get_client().messages.with_raw_response.create(
+        model=BLURB_MODEL,
+        max_tokens=max_tokens,
+        messages=[{"role": "user", "content": prompt}]
+    )
+    message = raw.parse()
+    return raw.headers, message.content[0].text
+
+
+def complete(prompt, max_tokens=BLURB_MAX_TOKENS, gate=None):
+    """Send a prompt through the rate gate, retrying transient failures.
+
+    Returns:
+        (text, error) - error is None on success
+    """
+    if not ANTHROPIC_API_KEY:
+        return None, "Anthropic API key not configured. Add ANTHROPIC_API_KEY to your .env file."
+    if anthropic is None:
+        return None, "Anthropic library not installed. Run: pip install anthropic"
+    gate = gate or _gate
+
+    for attempt in range(BLURB_MAX_RETRIES + 1):
+        can_retry = attempt < BLURB_MAX_RETRIES
+        wait = None
+        gate.acquire()
+        try:
+            headers, text = _create(prompt, max_tokens)
+            gate.observe(headers)
+            return text, None
+        except anthropic.APIStatusError as e:
+            if e.status_code not in TRANSIENT_STATUSES or not can_retry:
+                return None, f"Error generating blurb: {str(e)}"
+            wait = _retry_after(e.response.headers)
+            wait = _backoff(attempt) if wait is None else min(wait, MAX_RETRY_WAIT)
+            if e.status_code == 429:
+                gate.throttled(wait)
+                wait = None
+        except anthropic.APIConnectionError as e:
+            if not can_retry:
+                return None, f"Error generating blurb: {str(e)}"
+            wait = _backoff(attempt)
+        except Exception as e:
+            return None, f"Error generating blurb: {str(e)}"
+        finally:
+            gate.release()
+        if wait:
+            time.sleep(wait)
+
+
+def generate_blurb(title, description, platform, creator_name=None, refresh=False):
+    """Generate one blurb, reusing the cached one for identical inputs unless refresh=True.
+
+    Returns:
+        (blurb, error)
+    """
+    key = blurb_key(title, description, platform, creator_name)
+    if not refresh:
+        cached = _cache.get(key)
+        if cached is not MISSING and cached:
+            return cached, None
+    text, error = complete(build_prompt(title, description, platform, creator_name))
+    if error:
+        return None, error
+    blurb = clamp_blurb(text)
+    _cache.set(key, blurb, ttl=BLURB_CACHE_TTL)
+    return blurb, None
+
+
+def generate_batch(items):
+    """Blurbs for several uncached items from one request.
+
+    Returns:
+        {item id: blurb} for the items that came back valid (the rest are left out)
+    """
+    text, error = complete(build_batch_prompt(items), max_tokens=BATCH_TOKENS_PER_ITEM * len(items))
+    if error:
+        print(f"⚠️  Batched blurb request failed ({len(items)} items): {error}")
+        return {}
+    blurbs = parse_batch(text)
+    results = {}
+    for item in items:
+        blurb = blurbs.get(str(item['id']))
+        if valid_blurb(blurb):
+            blurb = blurb.strip()
+            key = blurb_key(item.get('title', ''), item.get('description', ''), item.get('platform'), item.get('creator_name'))
+            _cache.set(key, blurb, ttl=BLURB_CACHE_TTL)
+            results[item['id']] = blurb
+    return results
+
+
+def generate_blurbs(items, progress_callback=None):
+    """Generate blurbs for many items concurrently.
+
+    Cached blurbs are reused; the rest are requested BLURB_BATCH_SIZE per call,
+    and anything a batch doesn't answer validly is generated on its own.
+
+    Args:
+        items: Dicts with id, title, description, platform and optionally creator_name
+        progress_callback: Called as progress_callback(done, total) after each item
+
+    Returns:
+        {item id: (blurb, error)}
+    """
+    items = list(items)
+    if not items:
+        return {}
+    results = {}
+
+    def done(content_id, result):
+        results[content_id] = result
+        if progress_callback:
+            progress_callback(len(results), len(items))
+
+    misses = []
+    for item in items:
+        cached = _cache.get(blurb_key(item.get('title', ''), item.get('description', ''), item.get('platform'), item.get('creator_name')))
+        if cached is not MISSING and cached:
+            done(item['id'], (cached, None))
+        else:
+            misses.append(item)
+    if not misses:
+        return results
+
+    def single(item):
+        return executor.submit(
+            generate_blurb,
+            title=item.get('title', ''),
+            description=item.get('description', ''),
+            platform=item.get('platform'),
+            creator_name=item.get('creator_name'),
+            refresh=True
+        )
+
+    batch_size = max(1, BLURB_BATCH_SIZE)
+    with ThreadPoolExecutor(max_workers=min(_gate.max_concurrency, len(misses))) as executor:
+        futures = {}
+        for i in range(0, len(misses), batch_size):
+            batch = misses[i:i + batch_size]
+            if len(batch) == 1:
+                futures[single(batch[0])] = batch[0]
+            else:
+                futures[executor.submit(generate_batch, batch)] = batch
+        # Callbacks run on the calling thread (Streamlit widgets can't be touched from workers)
+        while futures:
+            for future in as_completed(list(futures)):
+                job = futures.pop(future)
+                if isinstance(job, list):
+                    blurbs = future.result()
+                    for item in job:
+                        if item['id'] in blurbs:
+                            done(item['id'], (blurbs[item['id']], None))
+                        else:
+                            futures[single(item)] = item
+                else:
+                    done(job['id'], future.result())
+    return results
@@ -0,0 +1,154 @@
+"""
+Hyrox Weekly - Bulk Database Writes
+
+Batch helpers shared by the discovery savers: a whole run's items are written
+with a few multi-row statements (psycopg2 execute_values) inside one
+transaction, instead of an INSERT + COMMIT round trip per item.
+
+The insert helpers take a cursor and leave committing to the caller;
+save_batch / save_content_items commit themselves so they can fall back to
+one transaction per row when a batch fails.
+"""
+
+from psycopg2.extras import execute_values
+
+# Rows per multi-row INSERT statement
+PAGE_SIZE = 500
+
+
+def _value(row, key, index):
+    """Read a column from a RealDictCursor row or a plain tuple row"""
+    return row[key] if isinstance(row, dict) else row[index]
+
+
+def insert_rows(cursor, table, rows, conflict=None, returning=None, page_size=PAGE_SIZE):
+    """INSERT a list of dicts (same keys) as multi-row statements.
+
+    Args:
+        cursor: psycopg2 cursor
+        table: Table name
+        rows: List of {column: value} dicts; the first row's keys define the columns
+        conflict: ON CONFLICT clause body, e.g. "(url) DO NOTHING"
+        returning: RETURNING column list, e.g. "id, url"
+
+    Returns:
+        Fetched RETURNING rows (empty list without `returning`)
+    """
+    if not rows:
+        return []
+    columns = list(rows[0])
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s"
+    if conflict:
+        sql += f" ON CONFLICT {conflict}"
+    if returning:
+        sql += f" RETURNING {returning}"
+    values = [tuple(row.get(col) for col in columns) for row in rows]
+    result = execute_values(cursor, sql, values, page_size=page_size, fetch=bool(returning))
+    return result or []
+
+
+def content_ids_for_urls(cursor, urls):
+    """Map existing content_items urls to ids in one query"""
+    urls = list(dict.fromkeys(u for u in urls if u))
+    if not urls:
+        return {}
+    cursor.execute("SELECT id, url FROM content_items WHERE url = ANY(%s)", (urls,))
+    return {_value(row, 'url', 1): _value(row, 'id', 0) for row in cursor.fetchall()}
+
+
+def existing_urls(cursor, urls):
+    """Dedup index: the subset of `urls` already in content_items, in one query"""
+    return set(content_ids_for_urls(cursor, urls))
+
+
+def insert_content_items(cursor, rows, page_size=PAGE_SIZE):
+    """Insert content_items rows, skipping urls that already exist (ON CONFLICT (url)).
+
+    Rows repeating a url within the batch are dropped (first one wins).
+
+    Returns:
+        {url: id} for the rows actually inserted
+    """
+    unique = {}
+    for row in rows:
+        if row.get('url') and row['url'] not in unique:
+            unique[row['url']] = row
+    inserted = insert_rows(cursor, 'content_items', list(unique.values()),
+                           conflict="(url) DO NOTHING", returning="id, url", page_size=page_size)
+    return {_value(row, 'url', 1): _value(row, 'id', 0) for row in inserted}
+
+
+def save_batch(conn, cursor, items, write, label=str):
+    """Run write(cursor, items) in one transaction, falling back to one item at a time.
+
+    Work already pending on the connection (e.g. creators the items reference) is
+    committed first. If the batch then fails it is rolled back and every item is
+    retried in its own transaction, so a bad row only loses itself.
+
+    Args:
+        conn: psycopg2 connection `cursor` belongs to
+        items: Items to write
+        write: Callable (cursor, items) -> {key: value} dict of what was written
+        label: Callable naming an item in error messages
+
+    Returns:
+        Merged dict of what `write` returned for the items that were saved
+    """
+    if not items:
+        return {}
+    conn.commit()
+    try:
+        written = write(cursor, items)
+        conn.commit()
+        return written
+    except Exception as e:
+        print(f"   ⚠️ Batch save failed ({e}), saving items one by one...")
+        conn.rollback()
+
+    written = {}
+    for item in items:
+        try:
+            written.update(write(cursor, [item]))
+            conn.commit()
+        except Exception as e:
+            print(f"   ⚠️ Error saving item {label(item)}: {e}")
+            conn.rollback()
+    return written
+
+
+def save_content_items(conn, cursor, rows):
+    """insert_content_items with save_batch's per-row fallback; commits.
+
+    Returns:
+        {url: id} for the rows actually inserted
+    """
+    return save_batch(conn, cursor, rows, insert_content_items, label=lambda row: row.get('url'))
+
+
+def upsert_creators(cursor, platform, names, page_size=PAGE_SIZE):
+    """Get or create creators keyed by (platform, platform_id=name) in one statement.
+
+    Returns:
+        {name: creator id}
+    """
+    names = list(dict.fromkeys(n for n in names if n))
+    rows = [{'name': name, 'platform': platform, 'platform_id': name} for name in names]
+    result = insert_rows(cursor, 'creators', rows,
+                         conflict="(platform, platform_id) DO UPDATE SET name = EXCLUDED.name",
+                         returning="id, platform_id", page_size=page_size)
+    return {_value(row, 'platform_id', 1): _value(row, 'id', 0) for row in result}
+
+
+def link_content(cursor, table, owner_column, owner_id, content_ids, extra=None, page_size=PAGE_SIZE):
+    """Link many content items to one owner (athlete/topic), ignoring existing links.
+
+    Args:
+        table: Link table, e.g. 'athlete_content'
+        owner_column: Owner FK column, e.g. 'athlete_id'
+        owner_id: Owner id
+        content_ids: Iterable of content ids
+        extra: Extra constant columns for every link row, e.g. {'status': 'discovered'}
+    """
+    rows = [{owner_column: owner_id, 'content_id': cid, **(extra or {})}
+            for cid in dict.fromkeys(content_ids)]
+    insert_rows(cursor, table, rows, conflict=f"({owner_column}, content_id) DO NOTHING", page_size=page_size)
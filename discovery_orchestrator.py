@@ -0,0 +1,338 @@
+"""
+Hyrox Weekly - Discovery Orchestrator
+
+Runs the platform discovery scripts in-process and concurrently, so a full
+discovery run takes about as long as the slowest platform instead of the sum
+of all of them (plus a Python interpreter start-up per script).
+
+Each discovery module is imported as a library and its main() is run on a
+worker thread with the selected week and settings passed in as arguments, so
+concurrent runs (e.g. two dashboard sessions) never share module state.
+Per-platform stdout is captured separately so the dashboard can still show
+each script's output (including prints from fetch_engine pool threads, which
+run in a copy of the submitting thread's context).
+"""
+
+import contextvars
+import importlib
+import io
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+
+from http_client import print_latency_summary
+
+# platform -> (module name, display name)
+DISCOVERY_MODULES = {
+    'youtube': ('youtube_discovery', 'YouTube'),
+    'podcast': ('podcast_discovery', 'Podcasts'),
+    'article': ('article_discovery', 'Articles'),
+    'reddit': ('reddit_discovery', 'Reddit'),
+    'instagram': ('instagram_discovery', 'Instagram'),
+}
+
+DEFAULT_PLATFORMS = ['youtube', 'podcast', 'article', 'reddit']
+
+# Same per-platform budget the subprocess runner used, counted from each platform's start
+DEFAULT_TIMEOUT_SECONDS = 120
+
+
+class DiscoveryResult:
+    """Outcome of one platform's discovery run"""
+
+    def __init__(self, platform, name):
+        self.platform = platform
+        self.name = name
+        self.success = False
+        self.items_found = 0
+        self.items_saved = 0
+        self.summary = {}
+        self.output = ''
+        self.error = None
+        self.elapsed_seconds = 0.0
+        self.started_at = None
+        self.timed_out = False
+        self.finished = False
+        self.late = None
+        self.future = None
+
+    @property
+    def status(self):
+        return 'completed' if self.success else 'failed'
+
+    @property
+    def running(self):
+        """True while a timed-out platform's worker is still going (and may still write)"""
+        return self.future is not None and not self.future.done()
+
+    def to_dict(self):
+        return {
+            'platform': self.platform,
+            'name': self.name,
+            'success': self.success,
+            'status': self.status,
+            'items_found': self.items_found,
+            'items_saved': self.items_saved,
+            'summary': self.summary,
+            'error': self.error,
+            'elapsed_seconds': self.elapsed_seconds,
+            'timed_out': self.timed_out,
+            'running': self.running,
+            'late': {k: v for k, v in self.late.items() if k != 'output'} if self.late else None,
+        }
+
+    def __repr__(self):
+        return (f"DiscoveryResult({self.platform!r}, success={self.success}, "
+                f"found={self.items_found}, saved={self.items_saved}, "
+                f"elapsed={self.elapsed_seconds:.1f}s)")
+
+
+class _ContextStdout:
+    """sys.stdout replacement that routes each worker thread's prints to its own buffer
+
+    The buffer lives in a context variable, so it is per thread but follows work
+    handed to a pool with a copied context (fetch_engine.fetch_all does this).
+    Threads that are not capturing write straight through to the original stream.
+    """
+
+    def __init__(self, fallback):
+        self._fallback = fallback
+        self._buffer = contextvars.ContextVar('stdout_buffer', default=None)
+
+    def capture(self, buffer):
+        self._buffer.set(buffer)
+
+    def release(self):
+        self._buffer.set(None)
+
+    def _target(self):
+        return self._buffer.get() or self._fallback
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self._fallback, name)
+
+
+def _to_datetime(value):
+    if isinstance(value, datetime):
+        return value
+    if hasattr(value, 'isoformat'):
+        value = value.isoformat()
+    return datetime.fromisoformat(str(value))
+
+
+_stdout_proxy = None
+_stdout_lock = threading.Lock()
+
+# platform -> DiscoveryResult of a timed-out run whose worker hasn't finished yet
+# (the lock also orders "timed out" against a worker recording its outcome)
+_stragglers = {}
+_stragglers_lock = threading.Lock()
+
+
+def _capturing_stdout():
+    """Install the per-thread stdout router once for the whole process.
+
+    It is never swapped back out, so overlapping runs can't restore each other's
+    stream; threads that aren't capturing still print to the original stdout.
+    """
+    global _stdout_proxy
+    with _stdout_lock:
+        if _stdout_proxy is None:
+            _stdout_proxy = _ContextStdout(sys.stdout)
+            sys.stdout = _stdout_proxy
+        return _stdout_proxy
+
+
+def platform_kwargs(platform, week_start=None, week_end=None, settings=None):
+    """Arguments for a discovery module's main() from the selected week and dashboard settings.
+
+    Mirrors what the scripts derive from DISCOVERY_WEEK_START / DISCOVERY_WEEK_END
+    and the YOUTUBE_* / PODCAST_* environment variables when run standalone.
+    """
+    kwargs = {}
+    if week_start and week_end:
+        kwargs['week_start'] = _to_datetime(week_start)
+        kwargs['week_end'] = _to_datetime(week_end) + timedelta(days=1)  # Include end day
+
+    settings = settings or {}
+    if platform == 'youtube':
+        if 'youtube_min_duration' in settings:
+            kwargs['min_duration'] = int(settings['youtube_min_duration'] or 0)
+        if 'youtube_region' in settings:
+            kwargs['region'] = settings['youtube_region'] or ''
+    if platform == 'podcast' and 'podcast_country' in settings:
+        kwargs['country'] = settings['podcast_country'] or ''
+    return kwargs
+
+
+def _record_outcome(result, outcome):
+    """Store a finished worker's outcome on its result.
+
+    A platform already reported as timed out keeps that report; how it ended is
+    kept separately in result.late.
+    """
+    with _stragglers_lock:
+        if result.timed_out:
+            result.late = outcome
+            return
+        result.finished = True
+        result.success = outcome['success']
+        result.summary = outcome['summary']
+        result.items_found = outcome['summary'].get('found', 0)
+        result.items_saved = outcome['summary'].get('saved', 0)
+        result.error = outcome['error']
+        result.elapsed_seconds = outcome['elapsed_seconds']
+        result.output = outcome['output']
+
+
+def _run_platform(module, kwargs, result, stdout_proxy):
+    buffer = io.StringIO()
+    stdout_proxy.capture(buffer)
+    start = time.time()
+    result.started_at = start
+    outcome = {'success': False, 'summary': {}, 'error': None}
+    try:
+        outcome['summary'] = module.main(**kwargs) or {}
+        outcome['success'] = True
+    except Exception as e:
+        import traceback
+        traceback.print_exc(file=buffer)
+        outcome['error'] = str(e)
+    finally:
+        stdout_proxy.release()
+        outcome['elapsed_seconds'] = time.time() - start
+        outcome['output'] = buffer.getvalue()
+        _record_outcome(result, outcome)
+    return result
+
+
+def run_discovery(platforms=None, week_start=None, week_end=None, settings=None,
+                  timeout=DEFAULT_TIMEOUT_SECONDS, on_result=None):
+    """Run discovery for several platforms concurrently in this process.
+
+    Args:
+        platforms: Platform keys from DISCOVERY_MODULES (default: DEFAULT_PLATFORMS)
+        week_start: First day of the discovery week (date, datetime or ISO string)
+        week_end: Last day of the discovery week (inclusive)
+        settings: Dashboard config dict (youtube_min_duration, youtube_region, podcast_country)
+        timeout: Seconds each platform gets, from its own start, before it is reported
+            as timed out. Python can't kill its thread, so it keeps running; check
+            result.running before acting on the database. Its eventual outcome goes to
+            result.late; the timed-out report itself is left as it was
+        on_result: Optional callback(DiscoveryResult), called on the calling thread as
+            each platform finishes (safe for Streamlit progress updates)
+
+    Returns:
+        dict of platform -> DiscoveryResult
+    """
+    platforms = platforms or DEFAULT_PLATFORMS
+    results = {}
+    runnable = []
+
+    for platform in platforms:
+        module_name, name = DISCOVERY_MODULES[platform]
+        result = DiscoveryResult(platform, name)
+        results[platform] = result
+        with _stragglers_lock:
+            straggler = _stragglers.get(platform)
+            if straggler and not straggler.running:
+                del _stragglers[platform]
+                straggler = None
+        if straggler:
+            result.future = straggler.future  # Still running, so callers hold off curating too
+            result.error = f"A previous {name} run is still going - try again once it finishes"
+            result.output = result.error
+            if on_result:
+                on_result(result)
+            continue
+        try:
+            module = importlib.import_module(module_name)
+            kwargs = platform_kwargs(platform, week_start, week_end, settings)
+            runnable.append((module, kwargs, result))
+        except Exception as e:
+            result.error = f"Could not load {module_name}: {e}"
+            result.output = result.error
+            if on_result:
+                on_result(result)
+
+    if not runnable:
+        return results
+
+    stdout_proxy = _capturing_stdout()
+    executor = ThreadPoolExecutor(max_workers=len(runnable), thread_name_prefix='discovery')
+    try:
+        submitted = time.time()
+        pending = {}
+        for module, kwargs, result in runnable:
+            result.future = executor.submit(_run_platform, module, kwargs, result, stdout_proxy)
+            pending[result.future] = result
+
+        def deadline(result):
+            return (result.started_at or submitted) + timeout
+
+        while pending:
+            next_deadline = min(deadline(result) for result in pending.values())
+            done, _ = wait(pending, timeout=max(0, next_deadline - time.time()), return_when=FIRST_COMPLETED)
+            for future in done:
+                result = pending.pop(future)
+                if on_result:
+                    on_result(result)
+
+            # Platforms past their own budget are reported and left to finish on their own
+            now = time.time()
+            for future, result in list(pending.items()):
+                if future.done() or now < deadline(result):
+                    continue
+                with _stragglers_lock:
+                    if result.finished:
+                        continue  # Finished just now; the next wait() reports it
+                    result.timed_out = True
+                    result.error = f"Timed out after {timeout} seconds (still running)"
+                    result.output = result.error
+                    result.elapsed_seconds = now - (result.started_at or submitted)
+                    _stragglers[result.platform] = result
+                del pending[future]
+                if on_result:
+                    on_result(result)
+    finally:
+        executor.shutdown(wait=False)
+
+    return results
+
+
+def main():
+    """Run all default platforms for the week in DISCOVERY_WEEK_START / DISCOVERY_WEEK_END"""
+    import os
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    start = time.time()
+    results = run_discovery(
+        week_start=os.getenv('DISCOVERY_WEEK_START'),
+        week_end=os.getenv('DISCOVERY_WEEK_END'),
+    )
+
+    for result in results.values():
+        print(f"\n=== {result.name} ===")
+        print(result.output)
+
+    print("=" * 70)
+    for result in results.values():
+        icon = "✅" if result.success else "❌"
+        print(f"{icon} {result.name}: found {result.items_found}, saved {result.items_saved} "
+              f"({result.elapsed_seconds:.1f}s){' - ' + result.error if result.error else ''}")
+    print(f"Total wall time: {time.time() - start:.1f}s")
+    print_latency_summary()
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Hyrox Weekly - Persistent Disk Cache
+
+Small SQLite-backed key/value store with per-entry TTLs, shared across runs
+and across discovery scripts. Values are stored as JSON.
+
+Usage:
+    from disk_cache import DiskCache, MISSING
+
+    cache = DiskCache('spotify')
+    value = cache.get(key)
+    if value is MISSING:
+        value = expensive_lookup()
+        cache.set(key, value, ttl=7 * 86400)
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+# Cache location (override with HYROX_CACHE_PATH)
+CACHE_PATH = os.getenv(
+    'HYROX_CACHE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'hyrox_weekly.sqlite3')
+)
+
+# Returned by get() on a miss, so cached None values (negative lookups) are distinguishable
+MISSING = object()
+
+_lock = threading.Lock()
+_initialized_paths = set()
+
+
+def normalize_key(text):
+    """Normalise free text (show/episode titles) into a stable cache key component"""
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFKD', str(text))
+    text = text.encode('ascii', 'ignore').decode('ascii').lower()
+    text = re.sub(r'[^a-z0-9]+', ' ', text)
+    return ' '.join(text.split())
+
+
+class DiskCache:
+    """Namespaced TTL cache stored in a shared SQLite file"""
+
+    def __init__(self, namespace, path=None):
+        self.namespace = namespace
+        self.path = path or CACHE_PATH
+        self._ensure_schema()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def _ensure_schema(self):
+        with _lock:
+            if self.path in _initialized_paths:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = self._connect()
+            try:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS cache_entries (
+                        namespace TEXT NOT NULL,
+                        key TEXT NOT NULL,
+                        value TEXT,
+                        expires_at REAL,
+                        PRIMARY KEY (namespace, key)
+                    )
+                """)
+                conn.commit()
+            finally:
+                conn.close()
+            _initialized_paths.add(self.path)
+
+    def get(self, key, default=MISSING):
+        """Return the cached value, or `default` if absent or expired"""
+        with _lock:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                    (self.namespace, key)
+                ).fetchone()
+                if row is None:
+                    return default
+                if row[1] is not None and row[1] < time.time():
+                    conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key))
+                    conn.commit()
+                    return default
+            finally:
+                conn.close()
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl=None):
+        """Store a JSON-serialisable value; ttl in seconds (None = never expires)"""
+        expires_at = time.time() + ttl if ttl else None
+        with _lock:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                    (self.namespace, key, json.dumps(value, default=str), expires_at)
+                )
+                conn.commit()
+            finally:
+                conn.close()
+
+    def incr(self, key, amount=1, ttl=None):
+        """Atomically add `amount` to an integer entry (created at 0); returns the new value"""
+        expires_at = time.time() + ttl if ttl else None
+        with _lock:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND key = ? AND expires_at < ?",
+                    (self.namespace, key, time.time())
+                )
+                conn.execute("""
+                    INSERT INTO cache_entries (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)
+                    ON CONFLICT (namespace, key) DO UPDATE SET value = CAST(value AS INTEGER) + excluded.value
+                """, (self.namespace, key, json.dumps(amount), expires_at))
+                value = conn.execute(
+                    "SELECT value FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key)
+                ).fetchone()[0]
+                conn.commit()
+            finally:
+                conn.close()
+        return json.loads(value)
+
+    def delete(self, key):
+        with _lock:
+            conn = self._connect()
+            try:
+                conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key))
+                conn.commit()
+            finally:
+                conn.close()
+
+    def clear(self):
+        """Remove every entry in this namespace"""
+        with _lock:
+            conn = self._connect()
+            try:
+                conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+                conn.commit()
+            finally:
+                conn.close()
+
+    def purge_expired(self):
+        """Delete expired entries across all namespaces"""
+        with _lock:
+            conn = self._connect()
+            try:
+                conn.execute("DELETE FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),))
+                conn.commit()
+            finally:
+                conn.close()
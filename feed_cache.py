@@ -0,0 +1,89 @@
+"""
+Hyrox Weekly - Conditional-GET Feed Cache
+
+Fetches RSS/Atom feeds with If-None-Match / If-Modified-Since and keeps the
+parsed items on disk (see disk_cache), so a feed that hasn't changed since the
+last run costs one small 304 request and no parsing.
+
+Servers that don't send validators still benefit: if the body is byte-for-byte
+identical to last time, the stored items are reused without re-parsing.
+
+Usage:
+    from feed_cache import fetch_feed
+
+    items, status = fetch_feed(url, parse=lambda content: parse_items(content))
+    # status: 'fetched', 'not_modified' (304) or 'unchanged' (same body)
+"""
+
+import hashlib
+
+import http_client
+from disk_cache import DiskCache, MISSING
+
+DEFAULT_HEADERS = {'User-Agent': 'Mozilla/5.0 (compatible; HyroxWeekly/1.0)'}
+
+# How long a feed's validators and items are kept without being seen again
+FEED_CACHE_TTL = 30 * 86400
+
+_cache = None
+
+
+def _get_cache():
+    global _cache
+    if _cache is None:
+        _cache = DiskCache('feeds')
+    return _cache
+
+
+def fetch_feed(url, parse, headers=None, timeout=10):
+    """Fetch a feed, reusing the cached parse result when the feed is unchanged.
+
+    Args:
+        url: Feed URL
+        parse: Callable(bytes) -> JSON-serialisable list of items
+        headers: Extra request headers (default: a HyroxWeekly User-Agent)
+        timeout: Request timeout in seconds
+
+    Returns:
+        (items, status) where status is 'fetched', 'not_modified' or 'unchanged'.
+        Network and HTTP errors are raised so callers keep their own handling.
+    """
+    cache = _get_cache()
+    entry = cache.get(url)
+    if entry is MISSING:
+        entry = None
+
+    request_headers = dict(headers or DEFAULT_HEADERS)
+    if entry:
+        if entry.get('etag'):
+            request_headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            request_headers['If-Modified-Since'] = entry['last_modified']
+
+    response = http_client.get(url, headers=request_headers, timeout=timeout)
+
+    if response.status_code == 304 and entry:
+        # Refresh the TTL so regularly polled feeds never fall out of the cache
+        cache.set(url, entry, ttl=FEED_CACHE_TTL)
+        return entry['items'], 'not_modified'
+
+    response.raise_for_status()
+
+    digest = hashlib.sha256(response.content).hexdigest()
+    if entry and entry.get('digest') == digest:
+        items, status = entry['items'], 'unchanged'
+    else:
+        items, status = parse(response.content), 'fetched'
+
+    cache.set(url, {
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'digest': digest,
+        'items': items,
+    }, ttl=FEED_CACHE_TTL)
+    return items, status
+
+
+def clear_feed_cache():
+    """Forget all stored feeds (next run re-downloads everything)"""
+    _get_cache().clear()
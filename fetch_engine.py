@@ -0,0 +1,137 @@
+"""
+Hyrox Weekly - Fetch Engine
+
+Runs independent HTTP fetches (search terms, RSS feeds, ...) in parallel while
+keeping each host inside its concurrency and rate limits.
+
+Limits are shared process-wide, so when the discovery orchestrator runs several
+platforms at once they all draw from the same per-host budget (e.g. the iTunes
+Search API's ~20 requests/minute).
+
+Usage:
+    from fetch_engine import fetch_all
+
+    results = fetch_all(discovery.search_episodes, terms, host='itunes.apple.com')
+    feeds = fetch_all(lambda f: fetch(f['url']), feeds, host=lambda f: f['url'])
+"""
+
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+# Per-host limits: max in-flight requests, sustained requests/second, burst size
+HOST_LIMITS = {
+    # iTunes Search API allows roughly 20 calls per minute
+    'itunes.apple.com': {'concurrency': 4, 'rate': 20 / 60, 'burst': 20},
+    'www.reddit.com': {'concurrency': 2, 'rate': 1, 'burst': 2},
+    'news.google.com': {'concurrency': 2, 'rate': 2, 'burst': 4},
+    'api.spotify.com': {'concurrency': 4, 'rate': 5, 'burst': 10},
+}
+
+DEFAULT_HOST_LIMIT = {'concurrency': 2, 'rate': 4, 'burst': 4}
+
+DEFAULT_MAX_WORKERS = 8
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens/second, holding at most `capacity`"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class HostLimiter:
+    """Concurrency cap plus token bucket for a single host"""
+
+    def __init__(self, concurrency, rate, burst):
+        self.semaphore = threading.BoundedSemaphore(concurrency)
+        self.bucket = TokenBucket(rate, burst)
+
+    @contextmanager
+    def slot(self):
+        with self.semaphore:
+            self.bucket.acquire()
+            yield
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def host_of(url_or_host):
+    """Normalise a URL or bare hostname to a lowercase hostname"""
+    if '://' in url_or_host:
+        return (urlparse(url_or_host).hostname or '').lower()
+    return url_or_host.lower()
+
+
+def get_limiter(host):
+    """Get the shared limiter for a host, creating it from HOST_LIMITS on first use"""
+    host = host_of(host)
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limits = HOST_LIMITS.get(host, DEFAULT_HOST_LIMIT)
+            limiter = HostLimiter(limits['concurrency'], limits['rate'], limits['burst'])
+            _limiters[host] = limiter
+        return limiter
+
+
+@contextmanager
+def limited(host):
+    """Hold a rate-limited slot for `host` (URL or hostname) for one request"""
+    with get_limiter(host).slot():
+        yield
+
+
+def fetch_all(func, items, host, max_workers=DEFAULT_MAX_WORKERS):
+    """Call func(item) for every item in parallel, respecting per-host limits.
+
+    Args:
+        func: Callable doing the request for one item
+        items: Iterable of inputs
+        host: Hostname/URL shared by all items, or callable(item) -> hostname/URL
+        max_workers: Upper bound on threads (per-host limits still apply)
+
+    Each call runs in a copy of the caller's context, so context-local state
+    (e.g. the orchestrator's per-platform stdout capture) carries into the pool.
+
+    Returns:
+        List of results in the same order as items. Exceptions raised by func
+        propagate, so callers should keep their own per-item error handling.
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    def run(item):
+        with limited(host(item) if callable(host) else host):
+            return func(item)
+
+    def run_in(context, item):
+        return context.run(run, item)
+
+    # One copy per item: a context can't be entered by two threads at once
+    contexts = [contextvars.copy_context() for _ in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(run_in, contexts, items))
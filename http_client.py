@@ -0,0 +1,205 @@
+"""
+Hyrox Weekly - Shared HTTP Client
+
+One place for every outbound HTTP call: a pooled keep-alive Session per host
+(so repeated calls to Supabase, iTunes, Spotify, Reddit... reuse connections
+instead of a new TCP+TLS handshake each), uniform connect/read timeouts,
+jittered exponential backoff on 429/5xx honouring Retry-After, and per-host
+latency metrics.
+
+Drop-in for the requests module functions; responses and exceptions are the
+usual requests ones.
+
+Usage:
+    import http_client
+
+    response = http_client.get(url, params=params, timeout=10)
+    response = http_client.post(url, headers=headers, json=data)
+    http_client.print_latency_summary()
+"""
+
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from fetch_engine import host_of
+
+# Seconds to establish a connection / to wait between bytes of the response
+CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '5'))
+READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '30'))
+
+# Attempts after the first one, for retryable failures
+MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', '3'))
+BACKOFF_BASE = 0.5
+# Longer Retry-After waits than this are not slept through; the response is returned as-is
+MAX_RETRY_WAIT = 60
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# 5xx and connection errors are only retried for these; 429 means the request
+# was rejected outright, so it is safe to retry for any method
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+POOL_SIZE = 16
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+
+def get_session(url):
+    """The shared keep-alive Session for a URL's host"""
+    host = host_of(url)
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _sessions[host] = session
+        return session
+
+
+def _timeout(timeout):
+    """A bare number from a caller is the read timeout; connect timeout stays uniform"""
+    if timeout is None:
+        return (CONNECT_TIMEOUT, READ_TIMEOUT)
+    if isinstance(timeout, (int, float)):
+        return (min(CONNECT_TIMEOUT, timeout), timeout)
+    return timeout
+
+
+def _retry_after(response):
+    """Seconds asked for by a Retry-After header (delta-seconds or HTTP date), or None"""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff(attempt):
+    """Full-jitter exponential backoff"""
+    return random.uniform(0, BACKOFF_BASE * (2 ** attempt))
+
+
+def _record(host, elapsed, error=False, retried=False):
+    with _metrics_lock:
+        stats = _metrics.setdefault(host, {'calls': 0, 'errors': 0, 'retries': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+        elapsed_ms = elapsed * 1000
+        stats['calls'] += 1
+        stats['errors'] += int(error)
+        stats['retries'] += int(retried)
+        stats['total_ms'] += elapsed_ms
+        stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+
+
+def request(method, url, timeout=None, retries=MAX_RETRIES, **kwargs):
+    """Send a request through the host's pooled session, retrying transient failures.
+
+    Args:
+        method: HTTP method
+        url: Request URL
+        timeout: Read timeout in seconds, or a (connect, read) tuple (default: module timeouts)
+        retries: Retry attempts for 429/5xx/connection errors (0 disables)
+        **kwargs: Passed to requests.Session.request
+
+    Returns:
+        requests.Response (the last one if retries ran out). Connection errors
+        and timeouts are raised once retries are exhausted.
+    """
+    method = method.upper()
+    host = host_of(url)
+    session = get_session(url)
+    timeout = _timeout(timeout)
+    idempotent = method in IDEMPOTENT_METHODS
+
+    for attempt in range(retries + 1):
+        can_retry = attempt < retries
+        start = time.monotonic()
+        try:
+            response = session.request(method, url, timeout=timeout, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            retry = can_retry and idempotent
+            _record(host, time.monotonic() - start, error=True, retried=retry)
+            if not retry:
+                raise
+            time.sleep(_backoff(attempt))
+            continue
+
+        retryable = response.status_code == 429 or (response.status_code in RETRY_STATUSES and idempotent)
+        wait = None
+        if retryable and can_retry:
+            wait = _retry_after(response)
+            wait = _backoff(attempt) if wait is None else wait
+            if wait > MAX_RETRY_WAIT:
+                wait = None
+        _record(host, time.monotonic() - start, error=response.status_code >= 400, retried=wait is not None)
+        if wait is None:
+            return response
+        response.close()
+        time.sleep(wait)
+
+
+def get(url, **kwargs):
+    return request('GET', url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request('POST', url, **kwargs)
+
+
+def patch(url, **kwargs):
+    return request('PATCH', url, **kwargs)
+
+
+def delete(url, **kwargs):
+    return request('DELETE', url, **kwargs)
+
+
+def latency_stats():
+    """Per-host call counts and latencies so far: {host: {calls, errors, retries, avg_ms, max_ms}}"""
+    with _metrics_lock:
+        return {
+            host: {
+                'calls': s['calls'],
+                'errors': s['errors'],
+                'retries': s['retries'],
+                'avg_ms': s['total_ms'] / s['calls'] if s['calls'] else 0.0,
+                'max_ms': s['max_ms'],
+            }
+            for host, s in _metrics.items()
+        }
+
+
+def reset_latency_stats():
+    with _metrics_lock:
+        _metrics.clear()
+
+
+def print_latency_summary():
+    stats = latency_stats()
+    if not stats:
+        return
+    print("\n🌐 HTTP calls by host:")
+    for host, s in sorted(stats.items(), key=lambda kv: -kv[1]['calls']):
+        line = f"   {host}: {s['calls']} calls, avg {s['avg_ms']:.0f}ms, max {s['max_ms']:.0f}ms"
+        if s['errors']:
+            line += f", {s['errors']} errors"
+        if s['retries']:
+            line += f", {s['retries']} retries"
+        print(line)
@@ -10,8 +10,10 @@ from psycopg2.extras import RealDictCursor
 from dotenv import load_dotenv
 import os
 import requests
+import http_client
 import time
 from datetime import datetime, timedelta
+from db_bulk import existing_urls, save_content_items
 
 load_dotenv()
 
@@ -73,7 +75,8 @@ class InstagramDiscovery:
         for attempt in range(retries):
             try:
                 print(f"      Fetching #{hashtag}... (attempt {attempt + 1})")
-                response = requests.get(url, headers=self.headers, params=params, timeout=60)
+                # This loop does its own retrying (with longer waits for RapidAPI)
+                response = http_client.get(url, headers=self.headers, params=params, timeout=60, retries=0)
                 response.raise_for_status()
                 data = response.json()
                 
@@ -207,6 +210,7 @@ class InstagramDatabaseManager:
         self.cursor = None
         self.creator_columns = []
         self.content_columns = []
+        self.creator_ids = {}  # username -> id, per run
     
     def connect(self):
         self.conn = psycopg2.connect(**DB_CONFIG)
@@ -225,10 +229,13 @@ class InstagramDatabaseManager:
     def get_or_create_creator(self, post):
         """Get or create creator from Instagram username."""
         username = post['username']
+        if username in self.creator_ids: return self.creator_ids[username]
         
         self.cursor.execute("SELECT id FROM creators WHERE platform_id = %s AND platform = 'instagram'", (username,))
         result = self.cursor.fetchone()
-        if result: return result['id']
+        if result:
+            self.creator_ids[username] = result['id']
+            return result['id']
         
         cols = ['name', 'platform']
         vals = [post.get('full_name') or username, 'instagram']
@@ -258,59 +265,60 @@ class InstagramDatabaseManager:
             f"INSERT INTO creators ({','.join(cols)}) VALUES ({','.join(['%s']*len(vals))}) RETURNING id", 
             vals
         )
-        self.conn.commit()
-        return self.cursor.fetchone()['id']
+        self.creator_ids[username] = self.cursor.fetchone()['id']
+        return self.creator_ids[username]
     
     def post_exists(self, url):
-        self.cursor.execute("SELECT id FROM content_items WHERE url = %s", (url,))
-        return self.cursor.fetchone() is not None
+        return url in self.existing_urls([url])
     
-    def save_post(self, post, creator_id):
-        cols = ['title', 'url', 'platform', 'creator_id', 'status']
+    def existing_urls(self, urls):
+        """Dedup index: which of these urls are already saved (one query per batch)."""
+        return existing_urls(self.cursor, urls)
+    
+    def _post_row(self, post, creator_id):
         # Use first line of caption as title, or generate one
         caption = post.get('caption', '')
         title = caption.split('\n')[0][:100] if caption else f"Instagram post by @{post['username']}"
-        vals = [title, post['url'], 'instagram', creator_id, 'discovered']
+        row = {'title': title, 'url': post['url'], 'platform': 'instagram',
+               'creator_id': creator_id, 'status': 'discovered'}
         
         if 'thumbnail_url' in self.content_columns: 
-            cols.append('thumbnail_url')
-            vals.append(post.get('thumbnail_url', ''))
+            row['thumbnail_url'] = post.get('thumbnail_url', '')
         if 'description' in self.content_columns: 
-            cols.append('description')
-            vals.append(post.get('caption', '')[:500])
+            row['description'] = post.get('caption', '')[:500]
         if 'published_date' in self.content_columns: 
-            cols.append('published_date')
-            vals.append(post.get('published_date'))
+            row['published_date'] = post.get('published_date')
         if 'view_count' in self.content_columns: 
-            cols.append('view_count')
-            vals.append(post.get('view_count', 0))
+            row['view_count'] = post.get('view_count', 0)
         if 'like_count' in self.content_columns: 
-            cols.append('like_count')
-            vals.append(post.get('like_count', 0))
+            row['like_count'] = post.get('like_count', 0)
         if 'comment_count' in self.content_columns: 
-            cols.append('comment_count')
-            vals.append(post.get('comment_count', 0))
+            row['comment_count'] = post.get('comment_count', 0)
         if 'category' in self.content_columns: 
-            cols.append('category')
-            vals.append('other')
+            row['category'] = 'other'
         if 'platform_id' in self.content_columns:
-            cols.append('platform_id')
-            vals.append(post.get('post_id', ''))
+            row['platform_id'] = post.get('post_id', '')
         
         # Store hashtag source in editorial note
         if 'editorial_note' in self.content_columns: 
-            cols.append('editorial_note')
             note = f"Hashtag: #{post.get('hashtag', 'hyrox')}"
             if post.get('is_video'):
                 note += " | Type: Video/Reel"
-            vals.append(note)
+            row['editorial_note'] = note
         
-        self.cursor.execute(
-            f"INSERT INTO content_items ({','.join(cols)}) VALUES ({','.join(['%s']*len(vals))}) RETURNING id", 
-            vals
-        )
-        self.conn.commit()
-        return self.cursor.fetchone()['id']
+        return row
+    
+    def save_post(self, post, creator_id):
+        return self.save_posts([(post, creator_id)]).get(post['url'])
+    
+    def save_posts(self, entries):
+        """Insert many posts in one transaction ([(post, creator_id)]).
+        
+        A failed batch is retried row by row, so a bad row only loses itself.
+        Returns {url: id} for the posts inserted (existing urls are skipped).
+        """
+        rows = [self._post_row(post, creator_id) for post, creator_id in entries]
+        return save_content_items(self.conn, self.cursor, rows)
 
 
 def test_api_connection():
@@ -327,7 +335,7 @@ def test_api_connection():
     params = {'query': 'hyrox'}
     
     try:
-        response = requests.get(test_url, headers=headers, params=params, timeout=30)
+        response = http_client.get(test_url, headers=headers, params=params, timeout=30)
         print(f"   Status: {response.status_code}")
         
         if response.status_code == 200:
@@ -349,12 +357,16 @@ def test_api_connection():
         return False
 
 
-def main():
+def main(week_start=None, week_end=None):
+    """Run Instagram discovery for the week (week_end exclusive, None = environment)"""
+    week_start = week_start or WEEK_START
+    week_end = week_end or WEEK_END
+
     print("=" * 70)
     print("INSTAGRAM DISCOVERY - Hyrox Content")
     print("=" * 70)
     
-    print(f"\n📅 Week: {WEEK_START.strftime('%Y-%m-%d')} to {WEEK_END.strftime('%Y-%m-%d')}")
+    print(f"\n📅 Week: {week_start.strftime('%Y-%m-%d')} to {week_end.strftime('%Y-%m-%d')}")
     
     if not RAPIDAPI_KEY:
         print("\n❌ Error: RAPIDAPI_KEY not found in .env file")
@@ -392,7 +404,7 @@ def main():
     print(f"   {len(engaged)} posts meet engagement threshold (>{MIN_LIKES} likes or >{MIN_COMMENTS} comments)")
     
     # Filter to selected week
-    recent = [p for p in engaged if WEEK_START <= p.get('published_date', datetime.now()) <= WEEK_END]
+    recent = [p for p in engaged if week_start <= p.get('published_date', datetime.now()) <= week_end]
     print(f"   {len(recent)} from selected week")
     
     # Sort by engagement (likes + comments)
@@ -402,21 +414,29 @@ def main():
     db.connect()
     
     saved, skipped = 0, 0
+    to_save = []
+    already_saved = db.existing_urls([post['url'] for post in recent])
     for post in recent:
-        if db.post_exists(post['url']):
+        if post['url'] in already_saved:
             skipped += 1
             continue
         
         creator_id = db.get_or_create_creator(post)
-        
-        try:
-            db.save_post(post, creator_id)
+        to_save.append((post, creator_id))
+    
+    # Write the whole batch in one transaction
+    try:
+        inserted = db.save_posts(to_save)
+        for post, _ in to_save:
+            if post['url'] not in inserted:
+                skipped += 1
+                continue
             saved += 1
             likes = post.get('like_count', 0)
             username = post.get('username', 'unknown')
             print(f"   ✅ Saved: [{likes:,} ❤️] @{username}: {post.get('caption', '')[:40]}...")
-        except Exception as e:
-            print(f"   ❌ Error: {e}")
+    except Exception as e:
+        print(f"   ❌ Error: {e}")
     
     db.close()
     
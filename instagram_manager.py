@@ -8,7 +8,7 @@ Since Instagram doesn't have a public API, this tool allows you to:
 
 Usage:
     python instagram_manager.py                    # Interactive mode
-    python instagram_manager.py add <url>          # Add single post
+    python instagram_manager.py add <url>...       # Add one or more posts
     python instagram_manager.py list               # List saved posts
 """
 
@@ -16,7 +16,7 @@ import psycopg2
 from psycopg2.extras import RealDictCursor
 from dotenv import load_dotenv
 import os
-import requests
+import http_client
 import re
 import sys
 from datetime import datetime
@@ -97,7 +97,7 @@ class InstagramManager:
         
         # Try to fetch Open Graph data from the page
         try:
-            response = requests.get(clean_url, headers=self.headers, timeout=10)
+            response = http_client.get(clean_url, headers=self.headers, timeout=10)
             
             if response.status_code == 200:
                 html = response.text
@@ -131,16 +131,26 @@ class InstagramManager:
     
     def post_exists(self, url):
         """Check if post already exists in database."""
-        post_id = self.extract_post_id(url)
-        if not post_id:
-            return False
+        return url in self.existing_posts([url])
+    
+    def existing_posts(self, urls):
+        """Check many URLs at once; returns the subset already in the database.
+        
+        Matches on the post ID, so /p/, /reel/ and /tv/ links to the same post count as duplicates.
+        """
+        post_ids = {url: self.extract_post_id(url) for url in urls}
+        patterns = list({f'%{post_id}%' for post_id in post_ids.values() if post_id})
+        if not patterns:
+            return set()
         
         self.cursor.execute("""
-            SELECT id FROM content_items 
-            WHERE platform = 'instagram' AND url LIKE %s
-        """, (f'%{post_id}%',))
+            SELECT url FROM content_items 
+            WHERE platform = 'instagram' AND url LIKE ANY(%s)
+        """, (patterns,))
+        saved_urls = [row['url'] for row in self.cursor.fetchall()]
         
-        return self.cursor.fetchone() is not None
+        return {url for url, post_id in post_ids.items()
+                if post_id and any(post_id in saved for saved in saved_urls)}
     
     def get_or_create_creator(self, author):
         """Get or create Instagram creator."""
@@ -171,11 +181,11 @@ class InstagramManager:
         self.conn.commit()
         return self.cursor.fetchone()['id']
     
-    def add_post(self, url, custom_title=None, custom_description=None, category='other'):
+    def add_post(self, url, custom_title=None, custom_description=None, category='other', check_exists=True):
         """Add an Instagram post to the database."""
         
         # Check if exists
-        if self.post_exists(url):
+        if check_exists and self.post_exists(url):
             print(f"   Post already exists in database")
             return None
         
@@ -332,11 +342,17 @@ def main():
             command = sys.argv[1].lower()
             
             if command == 'add' and len(sys.argv) > 2:
-                url = sys.argv[2]
-                print(f"Adding Instagram post: {url}")
-                post_id = manager.add_post(url)
-                if post_id:
-                    print(f"✓ Added (ID: {post_id})")
+                urls = sys.argv[2:]
+                # One duplicate check for every URL given
+                existing = manager.existing_posts(urls)
+                for url in urls:
+                    print(f"Adding Instagram post: {url}")
+                    if url in existing:
+                        print(f"   Post already exists in database")
+                        continue
+                    post_id = manager.add_post(url, check_exists=False)
+                    if post_id:
+                        print(f"✓ Added (ID: {post_id})")
                     
             elif command == 'list':
                 posts = manager.list_posts()
@@ -352,7 +368,7 @@ def main():
             else:
                 print("Usage:")
                 print("  python instagram_manager.py              # Interactive mode")
-                print("  python instagram_manager.py add <url>    # Add single post")
+                print("  python instagram_manager.py add <url>... # Add one or more posts")
                 print("  python instagram_manager.py list         # List saved posts")
         else:
             interactive_mode(manager)
@@ -0,0 +1,33 @@
+-- Migration: Dashboard Aggregates
+-- Grouped counts computed in Postgres and exposed through PostgREST, so the
+-- dashboard's stats pages fetch a handful of rows instead of every item/subscriber
+
+-- Function: content counts by platform and status, optionally for a published_date range
+-- Called as POST /rest/v1/rpc/content_counts {"p_start": "2025-01-06", "p_end": "2025-01-13"}
+-- (p_end is exclusive; omit both for all-time counts)
+CREATE OR REPLACE FUNCTION content_counts(p_start DATE DEFAULT NULL, p_end DATE DEFAULT NULL)
+RETURNS TABLE (platform VARCHAR, status VARCHAR, count BIGINT) AS $$
+    SELECT ci.platform, ci.status, COUNT(*)
+    FROM content_items ci
+    WHERE (p_start IS NULL OR ci.published_date >= p_start)
+      AND (p_end IS NULL OR ci.published_date < p_end)
+    GROUP BY ci.platform, ci.status;
+$$ LANGUAGE sql STABLE;
+
+-- Index for the weekly counts (range on published_date, grouped by platform/status)
+CREATE INDEX IF NOT EXISTS idx_content_published_platform_status
+    ON content_items(published_date, platform, status);
+
+-- View: Subscriber stats for admin dashboard (adds totals per status; existing columns unchanged)
+CREATE OR REPLACE VIEW subscriber_stats AS
+SELECT
+    COUNT(*) FILTER (WHERE subscription_status = 'active') as total_active,
+    COUNT(*) FILTER (WHERE subscription_status = 'active' AND subscription_tier = 'monthly') as monthly_count,
+    COUNT(*) FILTER (WHERE subscription_status = 'active' AND subscription_tier = 'yearly') as yearly_count,
+    COUNT(*) FILTER (WHERE is_early_bird = true AND subscription_status = 'active') as early_bird_count,
+    (SELECT value::INTEGER FROM premium_settings WHERE key = 'early_bird_limit') -
+        COUNT(*) FILTER (WHERE is_early_bird = true AND subscription_status = 'active') as early_bird_remaining,
+    COUNT(*) as total_count,
+    COUNT(*) FILTER (WHERE subscription_status = 'cancelled') as cancelled_count,
+    COUNT(*) FILTER (WHERE subscription_status = 'past_due') as past_due_count
+FROM subscribers;
@@ -0,0 +1,48 @@
+-- Migration: Curation Keyset Pagination
+-- Exposes the curation sort order as a single comparable key, so the dashboard
+-- can page with "curation_key > last seen key" instead of loading every row
+
+-- Sort order (matches the dashboard's previous ORDER BY):
+--   display_order ASC NULLS LAST, view_count DESC NULLS LAST,
+--   engagement_score DESC NULLS LAST, published_date DESC (NULLS FIRST), id DESC
+-- Every component is mapped to an ascending number, so the array compares
+-- lexicographically in exactly that order. id makes the key unique.
+CREATE OR REPLACE FUNCTION curation_key(
+    p_display_order INTEGER,
+    p_view_count INTEGER,
+    p_engagement_score NUMERIC,
+    p_published_date TIMESTAMP,
+    p_id INTEGER
+)
+RETURNS NUMERIC[] AS $$
+    SELECT ARRAY[
+        COALESCE(p_display_order::NUMERIC, 1e18),
+        COALESCE(-p_view_count::NUMERIC, 1e18),
+        COALESCE(-p_engagement_score::NUMERIC, 1e18),
+        COALESCE(-EXTRACT(EPOCH FROM p_published_date)::NUMERIC, -1e18),
+        -p_id::NUMERIC
+    ];
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE VIEW content_items_curation AS
+SELECT
+    ci.*,
+    curation_key(ci.display_order, ci.view_count, ci.engagement_score, ci.published_date, ci.id) AS curation_key
+FROM content_items ci;
+
+-- The dashboard always pages within one week (published_date range), so index
+-- that range rather than the key: a page reads only the week's matching rows,
+-- computes their keys and keeps the first `limit` (a top-N sort). Cost grows
+-- with the items in the selected week, not with the whole table.
+-- One for a single platform, one for "all platforms" (status filter only).
+-- (replaces the earlier key-ordered indexes, which the week filter defeated)
+DROP INDEX IF EXISTS idx_content_curation_platform;
+DROP INDEX IF EXISTS idx_content_curation_status;
+CREATE INDEX IF NOT EXISTS idx_content_status_platform_published
+    ON content_items (status, platform, published_date);
+CREATE INDEX IF NOT EXISTS idx_content_status_published
+    ON content_items (status, published_date);
+
+-- Cursors are read as text so they round-trip exactly (no float rounding through JSON):
+--   /content_items_curation?select=*,cursor:curation_key::text&order=curation_key.asc&limit=15
+--   /content_items_curation?...&curation_key=gt.{...last cursor...}
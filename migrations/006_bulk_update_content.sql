@@ -0,0 +1,19 @@
+-- Migration: Bulk Content Updates
+-- Lets the dashboard save a batch of curation edits (different fields and
+-- values per item) in one request instead of one PATCH per click
+
+-- Function: apply per-item updates and return the updated rows
+-- Called as POST /rest/v1/rpc/bulk_update_content
+--   {"p_updates": [{"id": 1, "status": "selected"}, {"id": 2, "category": "training", "display_order": 3}]}
+-- Only the keys present on each element are changed.
+CREATE OR REPLACE FUNCTION bulk_update_content(p_updates JSONB)
+RETURNS SETOF content_items AS $$
+    UPDATE content_items ci SET
+        status = CASE WHEN u.data ? 'status' THEN u.data->>'status' ELSE ci.status END,
+        category = CASE WHEN u.data ? 'category' THEN u.data->>'category' ELSE ci.category END,
+        display_order = CASE WHEN u.data ? 'display_order' THEN (u.data->>'display_order')::INTEGER ELSE ci.display_order END,
+        updated_at = COALESCE((u.data->>'updated_at')::TIMESTAMPTZ AT TIME ZONE 'UTC', CURRENT_TIMESTAMP)
+    FROM jsonb_array_elements(p_updates) AS u(data)
+    WHERE ci.id = (u.data->>'id')::INTEGER
+    RETURNING ci.*;
+$$ LANGUAGE sql;
@@ -0,0 +1,19 @@
+-- Migration: Bulk Blurb Updates
+-- Lets bulk_update_content also save AI blurbs, so a batch of generated
+-- blurbs is written back in one request instead of one or two PATCHes per item
+
+-- Same contract as 006: only the keys present on each element are changed
+--   {"p_updates": [{"id": 1, "ai_description": "...", "use_ai_description": true}]}
+CREATE OR REPLACE FUNCTION bulk_update_content(p_updates JSONB)
+RETURNS SETOF content_items AS $$
+    UPDATE content_items ci SET
+        status = CASE WHEN u.data ? 'status' THEN u.data->>'status' ELSE ci.status END,
+        category = CASE WHEN u.data ? 'category' THEN u.data->>'category' ELSE ci.category END,
+        display_order = CASE WHEN u.data ? 'display_order' THEN (u.data->>'display_order')::INTEGER ELSE ci.display_order END,
+        ai_description = CASE WHEN u.data ? 'ai_description' THEN u.data->>'ai_description' ELSE ci.ai_description END,
+        use_ai_description = CASE WHEN u.data ? 'use_ai_description' THEN (u.data->>'use_ai_description')::BOOLEAN ELSE ci.use_ai_description END,
+        updated_at = COALESCE((u.data->>'updated_at')::TIMESTAMPTZ AT TIME ZONE 'UTC', CURRENT_TIMESTAMP)
+    FROM jsonb_array_elements(p_updates) AS u(data)
+    WHERE ci.id = (u.data->>'id')::INTEGER
+    RETURNING ci.*;
+$$ LANGUAGE sql;
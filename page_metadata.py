@@ -0,0 +1,143 @@
+"""
+Hyrox Weekly - Page Metadata Extractor
+
+Reads og:/twitter: meta tags (thumbnails, titles) from article pages without
+downloading or parsing whole documents: the response is streamed into an
+incremental parser that stops at </head> (or <body>, or a byte cap).
+
+Results are cached on disk by URL (see disk_cache), and extract_thumbnails()
+fetches many pages in parallel within the per-host limits of fetch_engine.
+
+Usage:
+    from page_metadata import extract_thumbnail, extract_thumbnails
+
+    thumbnail = extract_thumbnail(url)
+    thumbnails = extract_thumbnails(urls)  # {url: thumbnail or None}
+"""
+
+import codecs
+from html.parser import HTMLParser
+
+import http_client
+from disk_cache import DiskCache, MISSING
+from fetch_engine import fetch_all
+
+DEFAULT_HEADERS = {'User-Agent': 'Mozilla/5.0 (compatible; HyroxWeekly/1.0)'}
+
+# Stop reading after this many bytes even if </head> hasn't appeared
+MAX_HEAD_BYTES = 256 * 1024
+CHUNK_SIZE = 16 * 1024
+
+METADATA_CACHE_TTL = 30 * 86400
+
+# Meta tags we keep, in thumbnail preference order first
+META_KEYS = ['og:image', 'twitter:image', 'twitter:image:src', 'og:title', 'og:description', 'og:site_name']
+THUMBNAIL_KEYS = ['og:image', 'twitter:image', 'twitter:image:src']
+
+# Images that are logos/placeholders rather than article artwork
+SKIP_IMAGE_PATTERNS = ['logo', 'icon', 'favicon', '1x1', 'placeholder', 'lh3.googleusercontent.com']
+
+_cache = None
+
+
+def _get_cache():
+    global _cache
+    if _cache is None:
+        _cache = DiskCache('page_metadata')
+    return _cache
+
+
+class _HeadMetaParser(HTMLParser):
+    """Collects <meta property|name=... content=...> until the document head ends"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.meta = {}
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'body':
+            self.done = True
+            return
+        if tag != 'meta':
+            return
+        attrs = dict(attrs)
+        key = (attrs.get('property') or attrs.get('name') or '').lower()
+        content = attrs.get('content')
+        if key in META_KEYS and content and key not in self.meta:
+            self.meta[key] = content.strip()
+
+    def handle_endtag(self, tag):
+        if tag == 'head':
+            self.done = True
+
+
+def _read_head_meta(url, headers, timeout, max_bytes):
+    parser = _HeadMetaParser()
+    with http_client.get(url, headers=headers or DEFAULT_HEADERS, timeout=timeout,
+                      allow_redirects=True, stream=True) as response:
+        if response.status_code != 200:
+            return None
+        decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+        read = 0
+        for chunk in response.iter_content(CHUNK_SIZE):
+            parser.feed(decoder.decode(chunk))
+            read += len(chunk)
+            if parser.done or read >= max_bytes:
+                break
+    return parser.meta
+
+
+def fetch_page_metadata(url, headers=None, timeout=10, max_bytes=MAX_HEAD_BYTES):
+    """Return the page's og:/twitter: meta tags as a dict (empty if none).
+
+    Returns None when the page couldn't be fetched. Successful reads are cached
+    by URL; failures are not, so they're retried next run.
+    """
+    if not url:
+        return None
+    cache = _get_cache()
+    cached = cache.get(url)
+    if cached is not MISSING:
+        return cached
+
+    try:
+        meta = _read_head_meta(url, headers, timeout, max_bytes)
+    except Exception:
+        return None
+
+    if meta is not None:
+        cache.set(url, meta, ttl=METADATA_CACHE_TTL)
+    return meta
+
+
+def pick_thumbnail(meta):
+    """Choose the best thumbnail from extracted meta tags, skipping logos/placeholders"""
+    for key in THUMBNAIL_KEYS:
+        img_url = (meta or {}).get(key)
+        if img_url and not any(skip in img_url.lower() for skip in SKIP_IMAGE_PATTERNS):
+            return img_url
+    return None
+
+
+def extract_thumbnail(url, headers=None):
+    """Thumbnail URL for an article page, or None"""
+    return pick_thumbnail(fetch_page_metadata(url, headers=headers))
+
+
+def extract_thumbnails(urls, headers=None):
+    """Thumbnails for many pages, fetched in parallel. Returns {url: thumbnail or None}"""
+    cache = _get_cache()
+    thumbnails = {}
+    to_fetch = []
+    for url in dict.fromkeys(u for u in urls if u):
+        cached = cache.get(url)
+        if cached is MISSING:
+            to_fetch.append(url)
+        else:
+            thumbnails[url] = pick_thumbnail(cached)
+
+    # Only cache misses need a rate-limited slot
+    fetched = fetch_all(lambda u: extract_thumbnail(u, headers=headers), to_fetch, host=lambda u: u)
+    thumbnails.update(zip(to_fetch, fetched))
+    return thumbnails
@@ -16,11 +16,16 @@ import psycopg2
 from psycopg2.extras import RealDictCursor
 from dotenv import load_dotenv
 import os
-import requests
+import http_client
 import time
 import base64
 from datetime import datetime, timedelta
+from difflib import SequenceMatcher
 from urllib.parse import quote
+from fetch_engine import fetch_all, limited
+from disk_cache import DiskCache, MISSING, normalize_key
+from feed_cache import fetch_feed
+from db_bulk import save_content_items
 
 load_dotenv()
 
@@ -37,6 +42,9 @@ DB_CONFIG = {
 SPOTIFY_CLIENT_ID = os.getenv('SPOTIFY_CLIENT_ID')
 SPOTIFY_CLIENT_SECRET = os.getenv('SPOTIFY_CLIENT_SECRET')
 
+# Default country/market filter for iTunes and Spotify, empty = global
+PODCAST_COUNTRY = os.getenv('PODCAST_COUNTRY', '')
+
 # Get week range from environment (set by dashboard) or default to past 14 days
 week_start_str = os.getenv('DISCOVERY_WEEK_START')
 week_end_str = os.getenv('DISCOVERY_WEEK_END')
@@ -49,6 +57,19 @@ else:
     WEEK_END = datetime.now().replace(hour=23, minute=59, second=59)
     WEEK_START = WEEK_END - timedelta(days=14)
 
+# Spotify lookup cache lifetimes (seconds) - persisted across runs in disk_cache
+SPOTIFY_SHOW_CACHE_TTL = 7 * 86400
+SPOTIFY_EPISODE_CACHE_TTL = 30 * 86400
+SPOTIFY_MISS_CACHE_TTL = 86400  # Not-found lookups are retried daily (new episodes take time to appear)
+
+# How Spotify episode links are resolved:
+#   'show'   - resolve each show once and match its episodes against the show's episode list (default)
+#   'search' - one /v1/search call per episode
+SPOTIFY_EPISODE_MATCH = os.getenv('SPOTIFY_EPISODE_MATCH', 'show')
+SPOTIFY_EPISODE_PAGE_SIZE = 50
+SPOTIFY_MAX_EPISODE_PAGES = 4
+SPOTIFY_MATCH_THRESHOLD = 0.75
+
 # Search terms for finding Hyrox content
 HYROX_SEARCH_TERMS = [
     "hyrox",
@@ -73,14 +94,21 @@ class SpotifyAPI:
     Supports two authentication modes:
     1. Client credentials (if SPOTIFY_CLIENT_ID and SPOTIFY_CLIENT_SECRET are set)
     2. Anonymous token (fallback - scrapes token from Spotify web interface)
+
+    Access tokens and show/episode lookups are cached on disk (see disk_cache),
+    so re-running discovery for the same or overlapping weeks makes few API calls.
     """
     
-    def __init__(self):
+    def __init__(self, market=None):
         self.access_token = None
+        self.market = PODCAST_COUNTRY if market is None else market
         self.token_expires = None
         self.has_credentials = bool(SPOTIFY_CLIENT_ID and SPOTIFY_CLIENT_SECRET)
         self.enabled = True  # Always enabled now with anonymous fallback
         self.using_anonymous = False
+        self.cache = DiskCache('spotify')
+        self.cache_hits = 0
+        self.api_calls = 0
         
         if self.has_credentials:
             print("   🎵 Spotify API credentials found - will fetch follower counts")
@@ -99,7 +127,7 @@ class SpotifyAPI:
             # Try the get_access_token endpoint that Spotify's web player uses
             # This is a more reliable method
             try:
-                token_response = requests.get(
+                token_response = http_client.get(
                     'https://open.spotify.com/get_access_token?reason=transport&productType=web_player',
                     headers={
                         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -134,7 +162,7 @@ class SpotifyAPI:
             
             # Fallback: Try the embed endpoint which sometimes works without auth
             try:
-                embed_response = requests.get(
+                embed_response = http_client.get(
                     'https://open.spotify.com/embed/show/4R9e7KqDb3g6FaG4qVnP1t',  # Any valid show ID
                     headers={
                         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -156,7 +184,7 @@ class SpotifyAPI:
                 print(f"      ⚠️ Embed endpoint failed: {e}")
             
             # Final fallback: original method
-            response = requests.get(
+            response = http_client.get(
                 'https://open.spotify.com/search',
                 headers={
                     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -198,19 +226,52 @@ class SpotifyAPI:
             print(f"   ⚠️ Anonymous Spotify auth error: {e}")
             return None
     
+    def _token_cache_keys(self):
+        return ['token:credentials', 'token:anonymous'] if self.has_credentials else ['token:anonymous']
+    
+    def _load_cached_token(self):
+        """Reuse a still-valid token from a previous run."""
+        for key in self._token_cache_keys():
+            cached = self.cache.get(key)
+            if cached is not MISSING and cached:
+                expires = datetime.fromtimestamp(cached['expires_at'])
+                if datetime.now() < expires:
+                    self.access_token = cached['token']
+                    self.token_expires = expires
+                    self.using_anonymous = key == 'token:anonymous'
+                    return self.access_token
+        return None
+    
+    def _save_token(self):
+        if not self.access_token or not self.token_expires:
+            return
+        ttl = (self.token_expires - datetime.now()).total_seconds()
+        if ttl > 0:
+            key = 'token:anonymous' if self.using_anonymous else 'token:credentials'
+            self.cache.set(key, {'token': self.access_token, 'expires_at': self.token_expires.timestamp()}, ttl=ttl)
+    
+    def _invalidate_token(self):
+        """Drop a token Spotify rejected, both in memory and on disk."""
+        self.cache.delete('token:anonymous' if self.using_anonymous else 'token:credentials')
+        self.access_token = None
+        self.token_expires = None
+    
     def get_access_token(self):
         """Get Spotify access token using client credentials or anonymous flow."""
         # Check if token is still valid
         if self.access_token and self.token_expires and datetime.now() < self.token_expires:
             return self.access_token
         
+        if self._load_cached_token():
+            return self.access_token
+        
         # Try client credentials first if available
         if self.has_credentials:
             try:
                 credentials = f"{SPOTIFY_CLIENT_ID}:{SPOTIFY_CLIENT_SECRET}"
                 encoded = base64.b64encode(credentials.encode()).decode()
                 
-                response = requests.post(
+                response = http_client.post(
                     'https://accounts.spotify.com/api/token',
                     headers={
                         'Authorization': f'Basic {encoded}',
@@ -225,6 +286,7 @@ class SpotifyAPI:
                     self.access_token = data['access_token']
                     self.token_expires = datetime.now() + timedelta(seconds=data['expires_in'] - 60)
                     self.using_anonymous = False
+                    self._save_token()
                     return self.access_token
                 else:
                     print(f"   ⚠️ Spotify credentials auth failed ({response.status_code}), trying anonymous...")
@@ -232,18 +294,27 @@ class SpotifyAPI:
                 print(f"   ⚠️ Spotify credentials error: {e}, trying anonymous...")
         
         # Fallback to anonymous token
-        return self.get_anonymous_token()
+        token = self.get_anonymous_token()
+        if token:
+            self._save_token()
+        return token
     
     def search_show(self, show_name):
         """Search for a podcast show on Spotify and return its info including followers."""
+        # Market from this run's settings, empty = global
+        spotify_market = self.market
+        cache_key = f"show:{spotify_market}:{normalize_key(show_name)}"
+        cached = self.cache.get(cache_key)
+        if cached is not MISSING:
+            self.cache_hits += 1
+            return cached
+        
         token = self.get_access_token()
         if not token:
             return None
         
         try:
             # Search for the show
-            # Get market from environment (set by dashboard) or default to empty
-            spotify_market = os.getenv('PODCAST_COUNTRY', '')
             
             params = {
                 'q': show_name,
@@ -255,30 +326,34 @@ class SpotifyAPI:
             if spotify_market:
                 params['market'] = spotify_market
             
-            response = requests.get(
-                'https://api.spotify.com/v1/search',
-                headers={'Authorization': f'Bearer {token}'},
-                params=params,
-                timeout=10
-            )
+            with limited('api.spotify.com'):
+                self.api_calls += 1
+                response = http_client.get(
+                    'https://api.spotify.com/v1/search',
+                    headers={'Authorization': f'Bearer {token}'},
+                    params=params,
+                    timeout=10
+                )
             
             if response.status_code == 200:
                 data = response.json()
                 shows = data.get('shows', {}).get('items', [])
                 
+                result = None
                 if shows:
                     show = shows[0]
-                    return {
+                    result = {
                         'spotify_id': show.get('id'),
                         'name': show.get('name'),
                         'followers': show.get('total_episodes', 0),  # Shows don't expose followers directly in search
                         'spotify_url': show.get('external_urls', {}).get('spotify'),
                         'image_url': show['images'][0]['url'] if show.get('images') else None
                     }
+                self.cache.set(cache_key, result, ttl=SPOTIFY_SHOW_CACHE_TTL if result else SPOTIFY_MISS_CACHE_TTL)
+                return result
             elif response.status_code == 401:
                 # Token expired or invalid, clear it and retry once
-                self.access_token = None
-                self.token_expires = None
+                self._invalidate_token()
                 return self.search_show(show_name)
             
             return None
@@ -290,31 +365,38 @@ class SpotifyAPI:
         """Get detailed show info including follower count."""
         if not show_id:
             return None
+        
+        # Market from this run's settings, empty = global
+        spotify_market = self.market
+        cache_key = f"show_details:{spotify_market}:{show_id}"
+        cached = self.cache.get(cache_key)
+        if cached is not MISSING:
+            self.cache_hits += 1
+            return cached
             
         token = self.get_access_token()
         if not token:
             return None
         
         try:
-            # Get market from environment (set by dashboard) or default to empty
-            spotify_market = os.getenv('PODCAST_COUNTRY', '')
-            
             params = {}
             if spotify_market:
                 params['market'] = spotify_market
             
-            response = requests.get(
-                f'https://api.spotify.com/v1/shows/{show_id}',
-                headers={'Authorization': f'Bearer {token}'},
-                params=params if params else None,
-                timeout=10
-            )
+            with limited('api.spotify.com'):
+                self.api_calls += 1
+                response = http_client.get(
+                    f'https://api.spotify.com/v1/shows/{show_id}',
+                    headers={'Authorization': f'Bearer {token}'},
+                    params=params if params else None,
+                    timeout=10
+                )
             
             if response.status_code == 200:
                 show = response.json()
                 # Note: Spotify doesn't expose follower counts for shows via API
                 # We'll use total_episodes as a proxy for show maturity/popularity
-                return {
+                result = {
                     'spotify_id': show.get('id'),
                     'name': show.get('name'),
                     'total_episodes': show.get('total_episodes', 0),
@@ -322,9 +404,10 @@ class SpotifyAPI:
                     'publisher': show.get('publisher'),
                     'description': show.get('description')
                 }
+                self.cache.set(cache_key, result, ttl=SPOTIFY_SHOW_CACHE_TTL)
+                return result
             elif response.status_code == 401:
-                self.access_token = None
-                self.token_expires = None
+                self._invalidate_token()
                 return self.get_show_details(show_id)
             
             return None
@@ -342,6 +425,13 @@ class SpotifyAPI:
         Returns:
             dict with 'episode_url' and 'episode_id' or None if not found
         """
+        spotify_market = self.market
+        cache_key = f"episode:{spotify_market}:{normalize_key(show_name)}:{normalize_key(episode_title)}"
+        cached = self.cache.get(cache_key)
+        if cached is not MISSING:
+            self.cache_hits += 1
+            return cached
+        
         token = self.get_access_token()
         if not token:
             return None
@@ -356,9 +446,6 @@ class SpotifyAPI:
             else:
                 search_query = episode_title[:80]
             
-            # Get market from environment
-            spotify_market = os.getenv('PODCAST_COUNTRY', '')
-            
             params = {
                 'q': search_query,
                 'type': 'episode',
@@ -368,17 +455,20 @@ class SpotifyAPI:
             if spotify_market:
                 params['market'] = spotify_market
             
-            response = requests.get(
-                'https://api.spotify.com/v1/search',
-                headers={'Authorization': f'Bearer {token}'},
-                params=params,
-                timeout=10
-            )
+            with limited('api.spotify.com'):
+                self.api_calls += 1
+                response = http_client.get(
+                    'https://api.spotify.com/v1/search',
+                    headers={'Authorization': f'Bearer {token}'},
+                    params=params,
+                    timeout=10
+                )
             
             if response.status_code == 200:
                 data = response.json()
                 episodes = data.get('episodes', {}).get('items', [])
                 
+                result = None
                 if episodes:
                     # Try to find the best match
                     episode_title_lower = episode_title.lower()
@@ -391,46 +481,232 @@ class SpotifyAPI:
                             # Get episode-specific image (Spotify provides episode artwork)
                             episode_images = ep.get('images', [])
                             episode_image = episode_images[0]['url'] if episode_images else None
-                            return {
+                            result = {
                                 'episode_id': ep.get('id'),
                                 'episode_url': ep.get('external_urls', {}).get('spotify'),
                                 'name': ep.get('name'),
                                 'show_name': ep.get('show', {}).get('name', ''),
                                 'episode_image': episode_image,
                             }
+                            break
 
-                    # If no close match, return the first result
-                    ep = episodes[0]
-                    # Get episode-specific image
-                    episode_images = ep.get('images', [])
-                    episode_image = episode_images[0]['url'] if episode_images else None
-                    return {
-                        'episode_id': ep.get('id'),
-                        'episode_url': ep.get('external_urls', {}).get('spotify'),
-                        'name': ep.get('name'),
-                        'show_name': ep.get('show', {}).get('name', ''),
-                        'episode_image': episode_image,
-                    }
+                    if not result:
+                        # If no close match, return the first result
+                        ep = episodes[0]
+                        # Get episode-specific image
+                        episode_images = ep.get('images', [])
+                        episode_image = episode_images[0]['url'] if episode_images else None
+                        result = {
+                            'episode_id': ep.get('id'),
+                            'episode_url': ep.get('external_urls', {}).get('spotify'),
+                            'name': ep.get('name'),
+                            'show_name': ep.get('show', {}).get('name', ''),
+                            'episode_image': episode_image,
+                        }
+                self.cache.set(cache_key, result, ttl=SPOTIFY_EPISODE_CACHE_TTL if result else SPOTIFY_MISS_CACHE_TTL)
+                return result
             elif response.status_code == 401:
                 # Token expired or invalid, clear and retry once
-                self.access_token = None
-                self.token_expires = None
+                self._invalidate_token()
                 return self.search_episode(episode_title, show_name)
             
             return None
         except Exception as e:
             print(f"   ⚠️ Spotify episode search error: {e}")
             return None
+    
+    def get_show_episodes(self, show_id, since=None):
+        """List a show's episodes, newest first, paging back until `since`.
+        
+        Returns a list of episode dicts (episode_id, episode_url, name,
+        release_date, episode_image), or None if the listing failed.
+        """
+        token = self.get_access_token()
+        if not token:
+            return None
+        
+        episodes = []
+        params = {'limit': SPOTIFY_EPISODE_PAGE_SIZE, 'offset': 0}
+        if self.market:
+            params['market'] = self.market
+        
+        try:
+            for _ in range(SPOTIFY_MAX_EPISODE_PAGES):
+                with limited('api.spotify.com'):
+                    self.api_calls += 1
+                    response = http_client.get(
+                        f'https://api.spotify.com/v1/shows/{show_id}/episodes',
+                        headers={'Authorization': f'Bearer {token}'},
+                        params=params,
+                        timeout=10
+                    )
+                
+                if response.status_code == 401:
+                    self._invalidate_token()
+                    token = self.get_access_token()
+                    if not token:
+                        return None
+                    continue
+                if response.status_code != 200:
+                    return episodes or None
+                
+                data = response.json()
+                items = [item for item in data.get('items', []) if item]
+                for item in items:
+                    images = item.get('images', [])
+                    episodes.append({
+                        'episode_id': item.get('id'),
+                        'episode_url': item.get('external_urls', {}).get('spotify'),
+                        'name': item.get('name', ''),
+                        'release_date': _parse_spotify_date(item.get('release_date')),
+                        'episode_image': images[0]['url'] if images else None,
+                    })
+                
+                # Episodes come newest first - stop once we've paged past the window
+                oldest = episodes[-1]['release_date'] if episodes else None
+                if not data.get('next') or not items or (since and oldest and oldest < since):
+                    break
+                params['offset'] += SPOTIFY_EPISODE_PAGE_SIZE
+            
+            return episodes
+        except Exception as e:
+            print(f"   ⚠️ Spotify show episodes error: {e}")
+            return episodes or None
+    
+    def match_show_episodes(self, show_name, discovered, since=None):
+        """Resolve Spotify links for several episodes of one show in a single batch.
+        
+        Looks the show up once, lists its episodes back to `since` and matches the
+        discovered episodes locally (title similarity plus publish date). Episodes
+        that can't be matched this way fall back to search_episode().
+        
+        Args:
+            show_name: Podcast title as discovered
+            discovered: List of discovered episode dicts (title, datePublished)
+            since: Oldest release date worth listing (defaults to WEEK_START)
+            
+        Returns:
+            dict of episode title -> search_episode()-style dict or None
+        """
+        market = self.market
+        since = since or WEEK_START
+        results = {}
+        pending = []
+        
+        for ep in discovered:
+            title = ep.get('title', '')
+            cached = self.cache.get(f"episode:{market}:{normalize_key(show_name)}:{normalize_key(title)}")
+            if cached is not MISSING and cached:
+                self.cache_hits += 1
+                results[title] = cached
+            else:
+                pending.append(ep)
+        
+        if not pending:
+            return results
+        
+        show = self.search_show(show_name)
+        candidates = None
+        if show and show.get('spotify_id'):
+            # One day of slack for timezone differences between feeds and Spotify
+            candidates = self.get_show_episodes(show['spotify_id'], since=since - timedelta(days=1))
+        
+        matches = _match_episodes(pending, candidates or [])
+        
+        for ep in pending:
+            title = ep.get('title', '')
+            match = matches.get(title)
+            if match:
+                result = {
+                    'episode_id': match['episode_id'],
+                    'episode_url': match['episode_url'],
+                    'name': match['name'],
+                    'show_name': show.get('name', show_name),
+                    'episode_image': match['episode_image'],
+                }
+                self.cache.set(f"episode:{market}:{normalize_key(show_name)}:{normalize_key(title)}",
+                               result, ttl=SPOTIFY_EPISODE_CACHE_TTL)
+                results[title] = result
+            else:
+                results[title] = self.search_episode(title, show_name)
+        
+        return results
+
+
+def _parse_spotify_date(value):
+    """Parse a Spotify release_date (day, month or year precision)."""
+    if not value:
+        return None
+    for fmt in ('%Y-%m-%d', '%Y-%m', '%Y'):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def _parse_published(ep):
+    date_str = ep.get('datePublished', '')
+    try:
+        pub_date = datetime.fromisoformat(str(date_str).replace('Z', '+00:00'))
+        return pub_date.replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def _episode_match_score(title, pub_date, candidate):
+    """Score how likely a Spotify episode is the discovered one (0-1+)."""
+    a = normalize_key(title)
+    b = normalize_key(candidate['name'])
+    if not a or not b:
+        return 0
+    score = SequenceMatcher(None, a, b).ratio()
+    # Feeds often add or drop a prefix/suffix ("Ep 42 | ...", "... - with Guest")
+    if min(len(a), len(b)) >= 15 and (a in b or b in a):
+        score = max(score, 0.9)
+    
+    release = candidate.get('release_date')
+    if pub_date and release:
+        days_apart = abs((pub_date.date() - release.date()).days)
+        if days_apart <= 1:
+            score += 0.1
+        elif days_apart > 7:
+            score -= 0.2
+    return score
+
+
+def _match_episodes(discovered, candidates):
+    """Match discovered episodes to a show's Spotify episodes, best pairs first.
+    
+    Each Spotify episode is used at most once. Returns title -> candidate.
+    """
+    scored = []
+    for ep in discovered:
+        title = ep.get('title', '')
+        pub_date = _parse_published(ep)
+        for i, candidate in enumerate(candidates):
+            score = _episode_match_score(title, pub_date, candidate)
+            if score >= SPOTIFY_MATCH_THRESHOLD:
+                scored.append((score, title, i))
+    
+    matches = {}
+    used = set()
+    for score, title, i in sorted(scored, key=lambda s: s[0], reverse=True):
+        if title in matches or i in used:
+            continue
+        matches[title] = candidates[i]
+        used.add(i)
+    return matches
 
 
 class PodcastDiscovery:
-    def __init__(self):
-        pass
+    def __init__(self, country=None):
+        self.country = PODCAST_COUNTRY if country is None else country
     
     def search_episodes(self, query, max_results=30):
         """Search for podcast episodes using iTunes Search API."""
-        # Get country from environment (set by dashboard) or default to empty for global
-        podcast_country = os.getenv('PODCAST_COUNTRY', '')
+        # Country from this run's settings, empty = global
+        podcast_country = self.country
         
         url = "https://itunes.apple.com/search"
         params = {
@@ -445,7 +721,7 @@ class PodcastDiscovery:
             params["country"] = podcast_country
         
         try:
-            response = requests.get(url, params=params)
+            response = http_client.get(url, params=params)
             response.raise_for_status()
             data = response.json()
             results = data.get('results', [])
@@ -509,6 +785,7 @@ class PodcastDatabaseManager:
         self.cursor = None
         self.creator_columns = []
         self.content_columns = []
+        self.creator_ids = {}  # podcast title -> id, per run
     
     def connect(self):
         """Establish database connection and discover schema."""
@@ -544,6 +821,9 @@ class PodcastDatabaseManager:
     
     def get_or_create_creator(self, podcast_title, podcast_author, podcast_image=None, follower_count=None, spotify_url=None):
         """Get or create a creator (podcast) record."""
+        if podcast_title in self.creator_ids:
+            return self.creator_ids[podcast_title]
+        
         # Check if exists
         self.cursor.execute("""
             SELECT id FROM creators 
@@ -557,7 +837,7 @@ class PodcastDatabaseManager:
                 self.cursor.execute("""
                     UPDATE creators SET follower_count = %s WHERE id = %s
                 """, (follower_count, result['id']))
-                self.conn.commit()
+            self.creator_ids[podcast_title] = result['id']
             return result['id']
         
         # Build dynamic INSERT based on available columns
@@ -594,21 +874,33 @@ class PodcastDatabaseManager:
         """
         
         self.cursor.execute(query, insert_vals)
-        self.conn.commit()
-        return self.cursor.fetchone()['id']
+        self.creator_ids[podcast_title] = self.cursor.fetchone()['id']
+        return self.creator_ids[podcast_title]
     
     def episode_exists(self, title, podcast_title):
         """Check if episode already exists in database."""
+        return (title, podcast_title) in self.existing_episodes([(title, podcast_title)])
+    
+    def existing_episodes(self, keys):
+        """Dedup index for a batch of (title, podcast title) keys, in one query.
+        
+        Returns the subset of keys already saved as podcast episodes.
+        """
+        keys = set(keys)
+        if not keys:
+            return set()
         self.cursor.execute("""
-            SELECT id FROM content_items 
-            WHERE title = %s AND platform = 'podcast'
-            AND creator_id IN (SELECT id FROM creators WHERE name = %s)
-        """, (title, podcast_title))
+            SELECT ci.title, c.name AS podcast_title
+            FROM content_items ci
+            JOIN creators c ON c.id = ci.creator_id
+            WHERE ci.platform = 'podcast'
+            AND ci.title = ANY(%s) AND c.name = ANY(%s)
+        """, (list({title for title, _ in keys}), list({show for _, show in keys})))
         
-        return self.cursor.fetchone() is not None
+        return {(row['title'], row['podcast_title']) for row in self.cursor.fetchall()} & keys
     
-    def save_episode(self, episode, creator_id, spotify_url, apple_url, show_followers=0):
-        """Save podcast episode to database."""
+    def _episode_row(self, episode, creator_id, spotify_url, apple_url, show_followers=0):
+        """Build the content_items row for an episode, using the columns this schema has."""
         # Parse publish date
         date_str = episode.get('datePublished', '')
         try:
@@ -625,65 +917,58 @@ class PodcastDatabaseManager:
         # Store Spotify and Apple URLs in editorial_note
         links_info = f"Spotify: {spotify_url} | Apple: {apple_url}"
         
-        # Build dynamic INSERT based on available columns
-        insert_cols = ['title', 'url', 'platform', 'creator_id', 'status']
-        insert_vals = [
-            episode.get('title', 'Untitled Episode'),
-            episode.get('link', '') or episode.get('enclosureUrl', ''),
-            'podcast',
-            creator_id,
-            'discovered'
-        ]
+        # Build row based on available columns
+        row = {
+            'title': episode.get('title', 'Untitled Episode'),
+            'url': episode.get('link', '') or episode.get('enclosureUrl', ''),
+            'platform': 'podcast',
+            'creator_id': creator_id,
+            'status': 'discovered',
+        }
         
         if 'thumbnail_url' in self.content_columns:
-            insert_cols.append('thumbnail_url')
             # Prioritize episode-specific image (from Spotify) over show/podcast image
             thumbnail = (episode.get('episode_image', '') or
                         episode.get('image', '') or
                         episode.get('podcast_image', ''))
-            insert_vals.append(thumbnail)
+            row['thumbnail_url'] = thumbnail
         
         if 'description' in self.content_columns:
-            insert_cols.append('description')
-            insert_vals.append(description)
+            row['description'] = description
         
         if 'published_date' in self.content_columns:
-            insert_cols.append('published_date')
-            insert_vals.append(published_date)
+            row['published_date'] = published_date
         
         if 'duration_seconds' in self.content_columns:
-            insert_cols.append('duration_seconds')
-            insert_vals.append(duration_seconds)
+            row['duration_seconds'] = duration_seconds
         
         # Use view_count to store show followers for sorting by popularity
         if 'view_count' in self.content_columns:
-            insert_cols.append('view_count')
-            insert_vals.append(show_followers or 0)
+            row['view_count'] = show_followers or 0
         
         if 'like_count' in self.content_columns:
-            insert_cols.append('like_count')
-            insert_vals.append(0)
+            row['like_count'] = 0
         
         if 'comment_count' in self.content_columns:
-            insert_cols.append('comment_count')
-            insert_vals.append(0)
+            row['comment_count'] = 0
         
         if 'editorial_note' in self.content_columns:
-            insert_cols.append('editorial_note')
-            insert_vals.append(links_info)
+            row['editorial_note'] = links_info
         
-        cols_str = ', '.join(insert_cols)
-        placeholders = ', '.join(['%s'] * len(insert_vals))
+        return row
+    
+    def save_episode(self, episode, creator_id, spotify_url, apple_url, show_followers=0):
+        """Save podcast episode to database."""
+        row = self._episode_row(episode, creator_id, spotify_url, apple_url, show_followers)
+        return self.save_episodes([row]).get(row['url'])
+    
+    def save_episodes(self, rows):
+        """Insert many episode rows (from _episode_row) in one transaction.
         
-        query = f"""
-            INSERT INTO content_items ({cols_str})
-            VALUES ({placeholders})
-            RETURNING id
+        A failed batch is retried row by row, so a bad row only loses itself.
+        Returns {url: id} for the episodes inserted (existing urls are skipped).
         """
-        
-        self.cursor.execute(query, insert_vals)
-        self.conn.commit()
-        return self.cursor.fetchone()['id']
+        return save_content_items(self.conn, self.cursor, rows)
 
 
 def filter_recent_episodes(episodes, week_start=None, week_end=None):
@@ -787,65 +1072,18 @@ def fetch_episodes_from_rss(feed_url, feed_name):
     
     try:
         print(f"   📡 Fetching RSS: {feed_name}...")
-        feed = feedparser.parse(feed_url)
-        
-        if feed.bozo and not feed.entries:
+        # Unchanged feeds come back from the feed cache without re-parsing
+        episodes, status = fetch_feed(
+            feed_url,
+            lambda content: parse_podcast_feed(feedparser.parse(content), feed_url, feed_name),
+            timeout=15,
+        )
+        if episodes is None:
             print(f"   ⚠️ Could not parse RSS feed for {feed_name}")
             return []
         
-        episodes = []
-        podcast_title = feed.feed.get('title', feed_name)
-        podcast_author = feed.feed.get('author', feed.feed.get('itunes_author', ''))
-        podcast_image = feed.feed.get('image', {}).get('href', '') or feed.feed.get('itunes_image', {}).get('href', '')
-        
-        for entry in feed.entries:
-            # Parse publish date
-            pub_date = None
-            if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                pub_date = datetime(*entry.published_parsed[:6])
-            elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                pub_date = datetime(*entry.updated_parsed[:6])
-            
-            # Get duration
-            duration = 0
-            if hasattr(entry, 'itunes_duration'):
-                dur_str = entry.itunes_duration
-                if dur_str:
-                    try:
-                        if ':' in str(dur_str):
-                            parts = str(dur_str).split(':')
-                            if len(parts) == 3:
-                                duration = int(parts[0]) * 3600 + int(parts[1]) * 60 + int(parts[2])
-                            elif len(parts) == 2:
-                                duration = int(parts[0]) * 60 + int(parts[1])
-                        else:
-                            duration = int(dur_str)
-                    except:
-                        pass
-            
-            # Get enclosure URL (audio file)
-            enclosure_url = ''
-            if hasattr(entry, 'enclosures') and entry.enclosures:
-                enclosure_url = entry.enclosures[0].get('href', '')
-            
-            episode = {
-                'title': entry.get('title', ''),
-                'description': entry.get('summary', entry.get('description', '')),
-                'datePublished': pub_date.isoformat() if pub_date else '',
-                'duration': duration,
-                'enclosureUrl': enclosure_url,
-                'link': entry.get('link', ''),
-                'image': entry.get('image', {}).get('href', '') or podcast_image,
-                'podcast_title': podcast_title,
-                'podcast_author': podcast_author,
-                'podcast_image': podcast_image,
-                'apple_podcasts_url': entry.get('link', ''),
-                'feedId': feed_url,
-                'from_priority_rss': True,  # Flag to indicate this came from RSS
-            }
-            episodes.append(episode)
-        
-        print(f"   ✓ Found {len(episodes)} episodes from {feed_name}")
+        cached_note = "" if status == 'fetched' else " (unchanged, cached)"
+        print(f"   ✓ Found {len(episodes)} episodes from {feed_name}{cached_note}")
         return episodes
         
     except Exception as e:
@@ -853,16 +1091,83 @@ def fetch_episodes_from_rss(feed_url, feed_name):
         return []
 
 
-def main():
+def parse_podcast_feed(feed, feed_url, feed_name):
+    """Convert a parsed feedparser feed into episode dicts (None if unparseable)"""
+    if feed.bozo and not feed.entries:
+        return None
+    
+    episodes = []
+    podcast_title = feed.feed.get('title', feed_name)
+    podcast_author = feed.feed.get('author', feed.feed.get('itunes_author', ''))
+    podcast_image = feed.feed.get('image', {}).get('href', '') or feed.feed.get('itunes_image', {}).get('href', '')
+    
+    for entry in feed.entries:
+        # Parse publish date
+        pub_date = None
+        if hasattr(entry, 'published_parsed') and entry.published_parsed:
+            pub_date = datetime(*entry.published_parsed[:6])
+        elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
+            pub_date = datetime(*entry.updated_parsed[:6])
+        
+        # Get duration
+        duration = 0
+        if hasattr(entry, 'itunes_duration'):
+            dur_str = entry.itunes_duration
+            if dur_str:
+                try:
+                    if ':' in str(dur_str):
+                        parts = str(dur_str).split(':')
+                        if len(parts) == 3:
+                            duration = int(parts[0]) * 3600 + int(parts[1]) * 60 + int(parts[2])
+                        elif len(parts) == 2:
+                            duration = int(parts[0]) * 60 + int(parts[1])
+                    else:
+                        duration = int(dur_str)
+                except:
+                    pass
+        
+        # Get enclosure URL (audio file)
+        enclosure_url = ''
+        if hasattr(entry, 'enclosures') and entry.enclosures:
+            enclosure_url = entry.enclosures[0].get('href', '')
+        
+        episode = {
+            'title': entry.get('title', ''),
+            'description': entry.get('summary', entry.get('description', '')),
+            'datePublished': pub_date.isoformat() if pub_date else '',
+            'duration': duration,
+            'enclosureUrl': enclosure_url,
+            'link': entry.get('link', ''),
+            'image': entry.get('image', {}).get('href', '') or podcast_image,
+            'podcast_title': podcast_title,
+            'podcast_author': podcast_author,
+            'podcast_image': podcast_image,
+            'apple_podcasts_url': entry.get('link', ''),
+            'feedId': feed_url,
+            'from_priority_rss': True,  # Flag to indicate this came from RSS
+        }
+        episodes.append(episode)
+    
+    return episodes
+
+
+def main(week_start=None, week_end=None, country=None):
+    """Run podcast discovery and return a summary dict (found/saved/skipped)
+
+    week_end is exclusive; anything left as None falls back to the environment.
+    """
+    week_start = week_start or WEEK_START
+    week_end = week_end or WEEK_END
+
     print("=" * 70)
     print("PODCAST DISCOVERY - Hyrox Content")
     print("=" * 70)
     
-    print(f"\n📅 Week: {WEEK_START.strftime('%Y-%m-%d')} to {WEEK_END.strftime('%Y-%m-%d')}")
+    print(f"\n📅 Week: {week_start.strftime('%Y-%m-%d')} to {week_end.strftime('%Y-%m-%d')}")
     
-    discovery = PodcastDiscovery()
+    discovery = PodcastDiscovery(country)
     db = PodcastDatabaseManager()
-    spotify = SpotifyAPI()
+    spotify = SpotifyAPI(country)
     
     # Cache for show follower counts to avoid repeated API calls
     show_followers_cache = {}
@@ -878,8 +1183,12 @@ def main():
     priority_rss_feeds = get_priority_podcast_rss_feeds()
     if priority_rss_feeds:
         print(f"\n📡 Priority podcast RSS feeds: {len(priority_rss_feeds)} feeds")
-        for feed_name, feed_url in priority_rss_feeds:
-            rss_episodes = fetch_episodes_from_rss(feed_url, feed_name)
+        feed_results = fetch_all(
+            lambda feed: fetch_episodes_from_rss(feed[1], feed[0]),
+            priority_rss_feeds,
+            host=lambda feed: feed[1],
+        )
+        for rss_episodes in feed_results:
             all_episodes.extend(rss_episodes)
     
     # Combine search terms with priority sources
@@ -887,13 +1196,17 @@ def main():
     
     print("\n🔍 Searching for Hyrox podcast episodes...")
     
-    for term in search_terms:
+    # Terms are independent - search in parallel within iTunes' rate limit
+    term_results = fetch_all(
+        lambda term: discovery.search_episodes(term, max_results=30),
+        search_terms,
+        host='itunes.apple.com',
+    )
+    for term, episodes in zip(search_terms, term_results):
         is_priority = term in priority_sources
         prefix = "⭐" if is_priority else "  "
-        print(f"{prefix} Searching: '{term}'...")
-        episodes = discovery.search_episodes(term, max_results=30)
+        print(f"{prefix} Searched: '{term}' ({len(episodes)} episodes)")
         all_episodes.extend(episodes)
-        time.sleep(0.5)  # Be nice to the API
     
     print(f"   ✓ Found {len(all_episodes)} total episodes")
     
@@ -909,7 +1222,7 @@ def main():
     print(f"   ✓ {len(unique_episodes)} unique episodes after deduplication")
     
     # Filter to selected week
-    recent_episodes = filter_recent_episodes(unique_episodes)
+    recent_episodes = filter_recent_episodes(unique_episodes, week_start, week_end)
     print(f"   ✓ {len(recent_episodes)} episodes from selected week")
     
     # Filter to Hyrox-relevant content
@@ -941,16 +1254,38 @@ def main():
     
     saved_count = 0
     skipped_count = 0
+    to_save = []
     
+    new_episodes = []
+    already_saved = db.existing_episodes(
+        (ep.get('title', 'Untitled'), ep.get('podcast_title', 'Unknown Podcast')) for ep in relevant_episodes
+    )
     for ep in relevant_episodes:
         title = ep.get('title', 'Untitled')
         podcast_title = ep.get('podcast_title', 'Unknown Podcast')
         
         # Check if already exists
-        if db.episode_exists(title, podcast_title):
+        if (title, podcast_title) in already_saved:
             skipped_count += 1
             print(f"   ⊙ Already exists: {title[:50]}...")
             continue
+        new_episodes.append(ep)
+    
+    # Resolve Spotify episode links per show: one show lookup + episode listing
+    # covers every new episode from that show
+    episode_links = {}
+    if spotify.enabled and SPOTIFY_EPISODE_MATCH == 'show':
+        episodes_by_show = {}
+        for ep in new_episodes:
+            episodes_by_show.setdefault(ep.get('podcast_title', 'Unknown Podcast'), []).append(ep)
+        for podcast_title, show_episodes in episodes_by_show.items():
+            matches = spotify.match_show_episodes(podcast_title, show_episodes, since=week_start)
+            for title, info in matches.items():
+                episode_links[(podcast_title, title)] = info
+    
+    for ep in new_episodes:
+        title = ep.get('title', 'Untitled')
+        podcast_title = ep.get('podcast_title', 'Unknown Podcast')
         
         # Get Spotify show info (with caching)
         show_followers = 0
@@ -966,7 +1301,6 @@ def main():
                 }
             else:
                 show_followers_cache[podcast_title] = {'total_episodes': 0, 'spotify_url': None}
-            time.sleep(0.1)  # Rate limiting
         
         if podcast_title in show_followers_cache:
             show_followers = show_followers_cache[podcast_title].get('total_episodes', 0)
@@ -985,7 +1319,10 @@ def main():
         spotify_url = None
         episode_specific_image = None
         if spotify.enabled:
-            episode_info = spotify.search_episode(title, podcast_title)
+            if SPOTIFY_EPISODE_MATCH == 'show':
+                episode_info = episode_links.get((podcast_title, ep.get('title', '')))
+            else:
+                episode_info = spotify.search_episode(title, podcast_title)
             if episode_info:
                 if episode_info.get('episode_url'):
                     spotify_url = episode_info['episode_url']
@@ -995,7 +1332,6 @@ def main():
                     episode_specific_image = episode_info['episode_image']
                     ep['episode_image'] = episode_specific_image  # Store for save_episode
                     print(f"      🖼️  Found episode-specific image")
-            time.sleep(0.1)  # Rate limiting
 
         # Fall back to show URL or search URL if no direct episode link found
         if not spotify_url:
@@ -1003,17 +1339,23 @@ def main():
         
         apple_url = ep.get('apple_podcasts_url', '') or discovery.generate_apple_podcasts_url(ep)
         
-        # Save episode with show popularity
-        try:
-            episode_id = db.save_episode(ep, creator_id, spotify_url, apple_url, show_followers=show_followers)
+        # Stage episode with show popularity
+        row = db._episode_row(ep, creator_id, spotify_url, apple_url, show_followers=show_followers)
+        to_save.append((ep, row, show_followers))
+    
+    # Write the whole batch in one transaction
+    try:
+        inserted = db.save_episodes([row for _, row, _ in to_save])
+        for ep, row, show_followers in to_save:
+            if row['url'] not in inserted:
+                skipped_count += 1
+                continue
             saved_count += 1
-            
             duration_min = (ep.get('duration', 0) or 0) // 60
             popularity_str = f" [Pop: {show_followers}]" if show_followers else ""
-            print(f"   ✓ Saved: {title[:45]}...{popularity_str} ({duration_min} min)")
-            
-        except Exception as e:
-            print(f"   ✗ Error saving {title[:30]}: {e}")
+            print(f"   ✓ Saved: {ep.get('title', 'Untitled')[:45]}...{popularity_str} ({duration_min} min)")
+    except Exception as e:
+        print(f"   ✗ Error saving episodes: {e}")
     
     db.close()
     
@@ -1024,11 +1366,15 @@ def main():
     print(f"   • New episodes saved: {saved_count}")
     print(f"   • Already in database: {skipped_count}")
     print(f"   • Total processed: {len(relevant_episodes)}")
+    if spotify.enabled:
+        print(f"   • Spotify API calls: {spotify.api_calls} ({spotify.cache_hits} served from cache)")
     print("\n📋 Next steps:")
     print("   1. Run: streamlit run curation_dashboard.py")
     print("   2. Review and select podcast episodes")
     print("   3. Episodes will appear with platform = 'podcast'")
 
+    return {'found': len(relevant_episodes), 'saved': saved_count, 'skipped': skipped_count}
+
 
 if __name__ == "__main__":
     try:
@@ -10,11 +10,15 @@ from dotenv import load_dotenv
 import psycopg2
 from psycopg2.extras import RealDictCursor
 import os
-import requests
+import http_client
 import re
 import feedparser
 from urllib.parse import quote
-from bs4 import BeautifulSoup
+import page_metadata
+from feed_cache import fetch_feed
+from fetch_engine import limited
+from youtube_quota import QuotaExceeded, get_ledger
+from db_bulk import content_ids_for_urls, insert_content_items, link_content, save_batch, upsert_creators
 
 # Try to import Google News URL decoder
 try:
@@ -82,34 +86,115 @@ def decode_google_news_url(url):
     return url
 
 
-def extract_thumbnail(url):
-    """Extract thumbnail from article page using og:image meta tag."""
-    try:
-        headers = {'User-Agent': 'Mozilla/5.0 (compatible; HyroxWeekly/1.0)'}
-        resp = requests.get(url, headers=headers, timeout=10)
-        if resp.status_code != 200:
-            return None
-
-        soup = BeautifulSoup(resp.text, 'html.parser')
-
-        # Try og:image first (most common)
-        og = soup.find('meta', property='og:image')
-        if og and og.get('content'):
-            img_url = og['content']
-            # Skip Google placeholder images
-            if 'lh3.googleusercontent.com' not in img_url:
-                return img_url
-
-        # Try twitter:image
-        twitter = soup.find('meta', attrs={'name': 'twitter:image'})
-        if twitter and twitter.get('content'):
-            img_url = twitter['content']
-            if 'lh3.googleusercontent.com' not in img_url:
-                return img_url
-
-        return None
-    except Exception:
-        return None
+def _parse_news_entries(content):
+    """Reduce a Google News RSS response to the entry fields we use (cached as JSON)"""
+    entries = []
+    for entry in feedparser.parse(content).entries:
+        source = entry.get('source', {})
+        entries.append({
+            'title': entry.get('title', ''),
+            'link': entry.get('link', ''),
+            'summary': entry.get('summary', ''),
+            'published': entry.get('published'),
+            'source': {'title': source.get('title', 'Unknown')} if isinstance(source, dict) else {},
+        })
+    return entries
+
+
+def fetch_google_news(rss_url):
+    """Fetch Google News RSS search results through the conditional-GET feed cache"""
+    with limited('news.google.com'):
+        entries, _ = fetch_feed(rss_url, _parse_news_entries, timeout=15)
+    return entries
+
+
+def add_thumbnails(articles):
+    """Fill thumbnail_url for decoded (non-Google News) article URLs in one parallel pass"""
+    urls = [a['url'] for a in articles if 'news.google.com' not in a['url']]
+    if urls:
+        print(f"   📷 Extracting {len(urls)} thumbnails...")
+    thumbnails = page_metadata.extract_thumbnails(urls)
+    for article in articles:
+        article['thumbnail_url'] = thumbnails.get(article['url'])
+
+
+def build_content_row(item, platform, parse_duration):
+    """Turn a discovered item into (creator name, content_items row)"""
+    creator_name = item.get('creator_name') or (item.get('snippet', {}).get('channelTitle') if platform == 'youtube' else 'Unknown')
+
+    if platform == 'youtube':
+        video_id = item['id']['videoId']
+        stats = item.get('stats', {})
+        content_data = {
+            'title': item['snippet']['title'],
+            'url': f"https://www.youtube.com/watch?v={video_id}",
+            'description': item['snippet'].get('description', ''),
+            'thumbnail_url': item['snippet']['thumbnails'].get('high', {}).get('url'),
+            'published_date': item['snippet'].get('publishedAt'),
+            'view_count': stats.get('view_count', 0),
+            'like_count': stats.get('like_count', 0),
+            'comment_count': stats.get('comment_count', 0),
+            'duration_seconds': parse_duration(stats.get('duration', 'PT0S')),
+        }
+    else:
+        content_data = {
+            'title': item.get('title', ''),
+            'url': item.get('url', ''),
+            'description': item.get('description', ''),
+            'thumbnail_url': item.get('thumbnail_url'),
+            'published_date': item.get('published_date'),
+            'duration_seconds': item.get('duration_seconds'),
+            'view_count': item.get('view_count', 0),
+            'like_count': 0,
+            'comment_count': item.get('comment_count', 0),
+        }
+
+    content_data.update({'platform': platform, 'status': 'discovered'})
+    return creator_name, content_data
+
+
+def _save_linked_rows(cursor, rows, platform, link_table, owner_column, owner_id, link_extra):
+    """Write (creator, row) pairs and their links with multi-row statements; returns {url: linked id}"""
+    existing = content_ids_for_urls(cursor, [row['url'] for _, row in rows])
+    new_rows = [(creator, row) for creator, row in rows if row['url'] not in existing]
+
+    # Creators are only needed for content we're about to insert
+    creator_ids = upsert_creators(cursor, platform, [creator for creator, _ in new_rows])
+    for creator, row in new_rows:
+        row['creator_id'] = creator_ids.get(creator)
+    inserted = insert_content_items(cursor, [row for _, row in new_rows])
+
+    content_ids = {**existing, **inserted}
+    linked = {row['url']: content_ids[row['url']] for _, row in rows if row['url'] in content_ids}
+    link_content(cursor, link_table, owner_column, owner_id, linked.values(), extra=link_extra)
+    return linked
+
+
+def save_linked_content(db, items, platform, parse_duration, link_table, owner_column, owner_id, link_extra):
+    """Bulk-save discovered items and link them to an athlete/topic in one transaction.
+
+    Existing content is looked up in one query, new creators and content rows are
+    inserted with multi-row statements, and all links are written at once. If the
+    batch fails, the items are retried one at a time so a bad row only loses itself.
+
+    Returns:
+        Number of items linked to the owner
+    """
+    rows = []
+    for item in items:
+        try:
+            rows.append(build_content_row(item, platform, parse_duration))
+        except Exception as e:
+            print(f"   ⚠️ Error preparing item: {e}")
+    if not rows:
+        return 0
+
+    def write(cursor, batch):
+        return _save_linked_rows(cursor, batch, platform, link_table, owner_column, owner_id, link_extra)
+
+    cursor = db.connect()
+    linked = save_batch(db.conn, cursor, rows, write, label=lambda item: item[1]['url'])
+    return len(set(linked.values()))
 
 
 class AthleteDiscovery:
@@ -177,7 +262,7 @@ class AthleteDiscovery:
                     'relevanceLanguage': 'en',
                 }
 
-                response = self.youtube.search().list(**search_params).execute()
+                response = get_ledger().execute(self.youtube.search().list(**search_params), 'search.list')
 
                 for item in response.get('items', []):
                     video_id = item['id']['videoId']
@@ -187,6 +272,9 @@ class AthleteDiscovery:
 
                 print(f"   '{term} hyrox': {len(response.get('items', []))} videos")
 
+            except QuotaExceeded as e:
+                print(f"   ⛔ Skipping remaining searches: {e}")
+                break
             except HttpError as e:
                 print(f"   ❌ Error searching '{term}': {e}")
 
@@ -196,13 +284,13 @@ class AthleteDiscovery:
             print(f"   📺 Fetching from athlete's channel: {channel_id}")
 
             try:
-                response = self.youtube.search().list(
+                response = get_ledger().execute(self.youtube.search().list(
                     channelId=channel_id,
                     type='video',
                     part='id,snippet',
                     maxResults=20,
                     order='date'
-                ).execute()
+                ), 'search.list')
 
                 for item in response.get('items', []):
                     video_id = item['id']['videoId']
@@ -212,7 +300,7 @@ class AthleteDiscovery:
 
                 print(f"   Channel videos: {len(response.get('items', []))} videos")
 
-            except HttpError as e:
+            except (HttpError, QuotaExceeded) as e:
                 print(f"   ❌ Error fetching channel: {e}")
 
         # Get video statistics
@@ -245,10 +333,10 @@ class AthleteDiscovery:
         try:
             for i in range(0, len(video_ids), 50):
                 batch = video_ids[i:i+50]
-                response = self.youtube.videos().list(
+                response = get_ledger().execute(self.youtube.videos().list(
                     part='statistics,contentDetails',
                     id=','.join(batch)
-                ).execute()
+                ), 'videos.list')
 
                 for item in response.get('items', []):
                     vid = item['id']
@@ -258,7 +346,7 @@ class AthleteDiscovery:
                         'comment_count': int(item['statistics'].get('commentCount', 0)),
                         'duration': item['contentDetails'].get('duration', 'PT0S'),
                     }
-        except HttpError as e:
+        except (HttpError, QuotaExceeded) as e:
             print(f"   ⚠️ Error getting stats: {e}")
         return stats
 
@@ -284,7 +372,7 @@ class AthleteDiscovery:
             try:
                 # iTunes Search API
                 search_url = f"https://itunes.apple.com/search?term={quote(term + ' hyrox')}&entity=podcastEpisode&limit={max_results}"
-                resp = requests.get(search_url, timeout=15)
+                resp = http_client.get(search_url, timeout=15)
 
                 if resp.status_code == 200:
                     data = resp.json()
@@ -323,9 +411,9 @@ class AthleteDiscovery:
             try:
                 # Google News RSS
                 rss_url = f"https://news.google.com/rss/search?q={quote(term + ' hyrox')}&hl=en-US&gl=US&ceid=US:en"
-                feed = feedparser.parse(rss_url)
+                entries = fetch_google_news(rss_url)
 
-                for entry in feed.entries[:max_results]:
+                for entry in entries[:max_results]:
                     url = entry.get('link', '')
                     if url and url not in seen_urls:
                         seen_urls.add(url)
@@ -337,124 +425,30 @@ class AthleteDiscovery:
                         # Decode Google News URL to get actual article URL
                         actual_url = decode_google_news_url(url)
 
-                        # Extract thumbnail from actual article
-                        thumbnail = None
-                        if actual_url != url:
-                            thumbnail = extract_thumbnail(actual_url)
-                            print(f"      📷 Extracted thumbnail for: {entry.get('title', '')[:40]}...")
-
                         all_articles.append({
                             'title': entry.get('title', ''),
                             'url': actual_url,
                             'description': entry.get('summary', ''),
                             'published_date': entry.get('published'),
                             'creator_name': source_name,
-                            'thumbnail_url': thumbnail,
                         })
 
-                print(f"   '{term} hyrox': {len(feed.entries)} articles")
+                print(f"   '{term} hyrox': {len(entries)} articles")
 
             except Exception as e:
                 print(f"   ❌ Error searching '{term}': {e}")
 
+        add_thumbnails(all_articles)
         print(f"   ✅ Total unique articles: {len(all_articles)}")
         return all_articles
 
     def save_content(self, items, platform):
         """Save discovered content to database and link to athlete"""
-        cursor = self.db.connect()
-        saved_count = 0
-
-        for item in items:
-            try:
-                # Check if content already exists
-                url = item.get('url') or f"https://www.youtube.com/watch?v={item['id']['videoId']}" if platform == 'youtube' else item.get('url')
-
-                cursor.execute("SELECT id FROM content_items WHERE url = %s", (url,))
-                existing = cursor.fetchone()
-
-                if existing:
-                    content_id = existing['id']
-                else:
-                    # Get or create creator
-                    creator_name = item.get('creator_name') or (item.get('snippet', {}).get('channelTitle') if platform == 'youtube' else 'Unknown')
-
-                    cursor.execute("""
-                        INSERT INTO creators (name, platform, platform_id)
-                        VALUES (%s, %s, %s)
-                        ON CONFLICT (platform, platform_id) DO UPDATE SET name = EXCLUDED.name
-                        RETURNING id
-                    """, (creator_name, platform, creator_name))
-                    creator_id = cursor.fetchone()['id']
-
-                    # Build content data
-                    if platform == 'youtube':
-                        video_id = item['id']['videoId']
-                        stats = item.get('stats', {})
-                        content_data = {
-                            'title': item['snippet']['title'],
-                            'url': f"https://www.youtube.com/watch?v={video_id}",
-                            'description': item['snippet'].get('description', ''),
-                            'thumbnail_url': item['snippet']['thumbnails'].get('high', {}).get('url'),
-                            'published_date': item['snippet'].get('publishedAt'),
-                            'view_count': stats.get('view_count', 0),
-                            'like_count': stats.get('like_count', 0),
-                            'comment_count': stats.get('comment_count', 0),
-                            'duration_seconds': self._parse_duration(stats.get('duration', 'PT0S')),
-                        }
-                    else:
-                        content_data = {
-                            'title': item.get('title', ''),
-                            'url': item.get('url', ''),
-                            'description': item.get('description', ''),
-                            'thumbnail_url': item.get('thumbnail_url'),
-                            'published_date': item.get('published_date'),
-                            'duration_seconds': item.get('duration_seconds'),
-                        }
-
-                    # Insert content
-                    cursor.execute("""
-                        INSERT INTO content_items
-                        (title, url, platform, creator_id, description, thumbnail_url,
-                         published_date, view_count, like_count, comment_count, duration_seconds, status)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'discovered')
-                        ON CONFLICT (url) DO NOTHING
-                        RETURNING id
-                    """, (
-                        content_data['title'],
-                        content_data['url'],
-                        platform,
-                        creator_id,
-                        content_data.get('description'),
-                        content_data.get('thumbnail_url'),
-                        content_data.get('published_date'),
-                        content_data.get('view_count', 0),
-                        content_data.get('like_count', 0),
-                        content_data.get('comment_count', 0),
-                        content_data.get('duration_seconds'),
-                    ))
-
-                    result = cursor.fetchone()
-                    if not result:
-                        continue
-                    content_id = result['id']
-
-                # Link to athlete (if not already linked)
-                cursor.execute("""
-                    INSERT INTO athlete_content (athlete_id, content_id, status, content_type)
-                    VALUES (%s, %s, 'discovered', %s)
-                    ON CONFLICT (athlete_id, content_id) DO NOTHING
-                """, (self.athlete_id, content_id, platform))
-
-                saved_count += 1
-
-            except Exception as e:
-                print(f"   ⚠️ Error saving item: {e}")
-                self.db.rollback()
-                cursor = self.db.connect()
-
-        self.db.commit()
-        return saved_count
+        return save_linked_content(
+            self.db, items, platform, self._parse_duration,
+            'athlete_content', 'athlete_id', self.athlete_id,
+            {'status': 'discovered', 'content_type': platform},
+        )
 
     def run_discovery(self, platforms=None):
         """Run discovery for specified platforms"""
@@ -534,14 +528,14 @@ class TopicDiscovery:
 
         for term in self.search_terms[:3]:
             try:
-                response = self.youtube.search().list(
+                response = get_ledger().execute(self.youtube.search().list(
                     q=term,
                     type='video',
                     part='id,snippet',
                     maxResults=max_results,
                     order='relevance',
                     relevanceLanguage='en',
-                ).execute()
+                ), 'search.list')
 
                 for item in response.get('items', []):
                     video_id = item['id']['videoId']
@@ -551,6 +545,9 @@ class TopicDiscovery:
 
                 print(f"   '{term}': {len(response.get('items', []))} videos")
 
+            except QuotaExceeded as e:
+                print(f"   ⛔ Skipping remaining searches: {e}")
+                break
             except HttpError as e:
                 print(f"   ❌ Error: {e}")
 
@@ -581,10 +578,10 @@ class TopicDiscovery:
         try:
             for i in range(0, len(video_ids), 50):
                 batch = video_ids[i:i+50]
-                response = self.youtube.videos().list(
+                response = get_ledger().execute(self.youtube.videos().list(
                     part='statistics,contentDetails',
                     id=','.join(batch)
-                ).execute()
+                ), 'videos.list')
 
                 for item in response.get('items', []):
                     vid = item['id']
@@ -594,7 +591,7 @@ class TopicDiscovery:
                         'comment_count': int(item['statistics'].get('commentCount', 0)),
                         'duration': item['contentDetails'].get('duration', 'PT0S'),
                     }
-        except HttpError as e:
+        except (HttpError, QuotaExceeded) as e:
             print(f"   ⚠️ Error: {e}")
         return stats
 
@@ -619,7 +616,7 @@ class TopicDiscovery:
         for term in self.search_terms[:2]:
             try:
                 search_url = f"https://itunes.apple.com/search?term={quote(term)}&entity=podcastEpisode&limit={max_results}"
-                resp = requests.get(search_url, timeout=15)
+                resp = http_client.get(search_url, timeout=15)
 
                 if resp.status_code == 200:
                     for ep in resp.json().get('results', []):
@@ -654,9 +651,9 @@ class TopicDiscovery:
         for term in self.search_terms[:2]:
             try:
                 rss_url = f"https://news.google.com/rss/search?q={quote(term)}&hl=en-US&gl=US&ceid=US:en"
-                feed = feedparser.parse(rss_url)
+                entries = fetch_google_news(rss_url)
 
-                for entry in feed.entries[:max_results]:
+                for entry in entries[:max_results]:
                     url = entry.get('link', '')
                     if url and url not in seen_urls:
                         seen_urls.add(url)
@@ -666,26 +663,20 @@ class TopicDiscovery:
                         # Decode Google News URL to get actual article URL
                         actual_url = decode_google_news_url(url)
 
-                        # Extract thumbnail from actual article
-                        thumbnail = None
-                        if actual_url != url:
-                            thumbnail = extract_thumbnail(actual_url)
-                            print(f"      📷 Extracted thumbnail for: {entry.get('title', '')[:40]}...")
-
                         all_articles.append({
                             'title': entry.get('title', ''),
                             'url': actual_url,
                             'description': entry.get('summary', ''),
                             'published_date': entry.get('published'),
                             'creator_name': source_name,
-                            'thumbnail_url': thumbnail,
                         })
 
-                print(f"   '{term}': {len(feed.entries)} articles")
+                print(f"   '{term}': {len(entries)} articles")
 
             except Exception as e:
                 print(f"   ❌ Error: {e}")
 
+        add_thumbnails(all_articles)
         print(f"   ✅ Total: {len(all_articles)} articles")
         return all_articles
 
@@ -705,7 +696,7 @@ class TopicDiscovery:
                     # Reddit search JSON endpoint
                     url = f"https://www.reddit.com/r/{subreddit}/search.json?q={quote(term)}&restrict_sr=1&sort=relevance&limit={max_results}"
                     headers = {'User-Agent': 'HyroxWeekly/1.0'}
-                    resp = requests.get(url, headers=headers, timeout=15)
+                    resp = http_client.get(url, headers=headers, timeout=15)
 
                     if resp.status_code == 200:
                         data = resp.json()
@@ -735,100 +726,11 @@ class TopicDiscovery:
 
     def save_content(self, items, platform):
         """Save content and link to topic"""
-        cursor = self.db.connect()
-        saved_count = 0
-
-        for item in items:
-            try:
-                url = item.get('url') or f"https://www.youtube.com/watch?v={item['id']['videoId']}" if platform == 'youtube' else item.get('url')
-
-                cursor.execute("SELECT id FROM content_items WHERE url = %s", (url,))
-                existing = cursor.fetchone()
-
-                if existing:
-                    content_id = existing['id']
-                else:
-                    # Get or create creator
-                    creator_name = item.get('creator_name') or (item.get('snippet', {}).get('channelTitle') if platform == 'youtube' else 'Unknown')
-
-                    cursor.execute("""
-                        INSERT INTO creators (name, platform, platform_id)
-                        VALUES (%s, %s, %s)
-                        ON CONFLICT (platform, platform_id) DO UPDATE SET name = EXCLUDED.name
-                        RETURNING id
-                    """, (creator_name, platform, creator_name))
-                    creator_id = cursor.fetchone()['id']
-
-                    # Build content data
-                    if platform == 'youtube':
-                        video_id = item['id']['videoId']
-                        stats = item.get('stats', {})
-                        content_data = {
-                            'title': item['snippet']['title'],
-                            'url': f"https://www.youtube.com/watch?v={video_id}",
-                            'description': item['snippet'].get('description', ''),
-                            'thumbnail_url': item['snippet']['thumbnails'].get('high', {}).get('url'),
-                            'published_date': item['snippet'].get('publishedAt'),
-                            'view_count': stats.get('view_count', 0),
-                            'like_count': stats.get('like_count', 0),
-                            'comment_count': stats.get('comment_count', 0),
-                            'duration_seconds': self._parse_duration(stats.get('duration', 'PT0S')),
-                        }
-                    else:
-                        content_data = {
-                            'title': item.get('title', ''),
-                            'url': item.get('url', ''),
-                            'description': item.get('description', ''),
-                            'thumbnail_url': item.get('thumbnail_url'),
-                            'published_date': item.get('published_date'),
-                            'duration_seconds': item.get('duration_seconds'),
-                            'view_count': item.get('view_count', 0),
-                            'comment_count': item.get('comment_count', 0),
-                        }
-
-                    # Insert content
-                    cursor.execute("""
-                        INSERT INTO content_items
-                        (title, url, platform, creator_id, description, thumbnail_url,
-                         published_date, view_count, like_count, comment_count, duration_seconds, status)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'discovered')
-                        ON CONFLICT (url) DO NOTHING
-                        RETURNING id
-                    """, (
-                        content_data['title'],
-                        content_data['url'],
-                        platform,
-                        creator_id,
-                        content_data.get('description'),
-                        content_data.get('thumbnail_url'),
-                        content_data.get('published_date'),
-                        content_data.get('view_count', 0),
-                        content_data.get('like_count', 0),
-                        content_data.get('comment_count', 0),
-                        content_data.get('duration_seconds'),
-                    ))
-
-                    result = cursor.fetchone()
-                    if not result:
-                        continue
-                    content_id = result['id']
-
-                # Link to topic
-                cursor.execute("""
-                    INSERT INTO performance_content (topic_id, content_id, status)
-                    VALUES (%s, %s, 'discovered')
-                    ON CONFLICT (topic_id, content_id) DO NOTHING
-                """, (self.topic_id, content_id))
-
-                saved_count += 1
-
-            except Exception as e:
-                print(f"   ⚠️ Error: {e}")
-                self.db.rollback()
-                cursor = self.db.connect()
-
-        self.db.commit()
-        return saved_count
+        return save_linked_content(
+            self.db, items, platform, self._parse_duration,
+            'performance_content', 'topic_id', self.topic_id,
+            {'status': 'discovered'},
+        )
 
     def run_discovery(self, platforms=None):
         """Run discovery for specified platforms"""
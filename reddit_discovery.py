@@ -9,9 +9,10 @@ import psycopg2
 from psycopg2.extras import RealDictCursor
 from dotenv import load_dotenv
 import os
-import requests
+import http_client
 import time
 from datetime import datetime, timedelta
+from db_bulk import existing_urls, save_content_items
 
 load_dotenv()
 
@@ -60,7 +61,7 @@ class RedditDiscovery:
         url = f"https://www.reddit.com/r/{subreddit}/{sort}.json?limit={limit}"
         
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = http_client.get(url, headers=self.headers, timeout=10)
             response.raise_for_status()
             data = response.json()
             
@@ -122,7 +123,7 @@ class RedditDiscovery:
         }
         
         try:
-            response = requests.get(url, headers=self.headers, params=params, timeout=10)
+            response = http_client.get(url, headers=self.headers, params=params, timeout=10)
             response.raise_for_status()
             data = response.json()
             
@@ -174,6 +175,7 @@ class RedditDatabaseManager:
         self.cursor = None
         self.creator_columns = []
         self.content_columns = []
+        self.creator_ids = {}  # subreddit -> id, per run
     
     def connect(self):
         self.conn = psycopg2.connect(**DB_CONFIG)
@@ -192,10 +194,13 @@ class RedditDatabaseManager:
     def get_or_create_creator(self, subreddit, author):
         """Create creator as the subreddit (not individual user)."""
         source_name = subreddit  # e.g., "r/hyrox"
+        if source_name in self.creator_ids: return self.creator_ids[source_name]
         
         self.cursor.execute("SELECT id FROM creators WHERE name = %s AND platform = 'reddit'", (source_name,))
         result = self.cursor.fetchone()
-        if result: return result['id']
+        if result:
+            self.creator_ids[source_name] = result['id']
+            return result['id']
         
         cols, vals = ['name', 'platform'], [source_name, 'reddit']
         if 'platform_id' in self.creator_columns: cols.append('platform_id'); vals.append(source_name)
@@ -204,24 +209,27 @@ class RedditDatabaseManager:
             vals.append(0.6)  # Reddit gets moderate credibility
         
         self.cursor.execute(f"INSERT INTO creators ({','.join(cols)}) VALUES ({','.join(['%s']*len(vals))}) RETURNING id", vals)
-        self.conn.commit()
-        return self.cursor.fetchone()['id']
+        self.creator_ids[source_name] = self.cursor.fetchone()['id']
+        return self.creator_ids[source_name]
     
     def post_exists(self, url):
-        self.cursor.execute("SELECT id FROM content_items WHERE url = %s", (url,))
-        return self.cursor.fetchone() is not None
+        return url in self.existing_urls([url])
     
-    def save_post(self, post, creator_id):
-        cols = ['title', 'url', 'platform', 'creator_id', 'status']
-        vals = [post['title'], post['url'], 'reddit', creator_id, 'discovered']
+    def existing_urls(self, urls):
+        """Dedup index: which of these urls are already saved (one query per batch)."""
+        return existing_urls(self.cursor, urls)
+    
+    def _post_row(self, post, creator_id):
+        row = {'title': post['title'], 'url': post['url'], 'platform': 'reddit',
+               'creator_id': creator_id, 'status': 'discovered'}
         
-        if 'thumbnail_url' in self.content_columns: cols.append('thumbnail_url'); vals.append(post.get('thumbnail_url', ''))
-        if 'description' in self.content_columns: cols.append('description'); vals.append(post.get('description', ''))
-        if 'published_date' in self.content_columns: cols.append('published_date'); vals.append(post.get('published_date'))
-        if 'view_count' in self.content_columns: cols.append('view_count'); vals.append(post.get('score', 0))  # Use score as "views"
-        if 'like_count' in self.content_columns: cols.append('like_count'); vals.append(post.get('score', 0))
-        if 'comment_count' in self.content_columns: cols.append('comment_count'); vals.append(post.get('num_comments', 0))
-        if 'category' in self.content_columns: cols.append('category'); vals.append('other')
+        if 'thumbnail_url' in self.content_columns: row['thumbnail_url'] = post.get('thumbnail_url', '')
+        if 'description' in self.content_columns: row['description'] = post.get('description', '')
+        if 'published_date' in self.content_columns: row['published_date'] = post.get('published_date')
+        if 'view_count' in self.content_columns: row['view_count'] = post.get('score', 0)  # Use score as "views"
+        if 'like_count' in self.content_columns: row['like_count'] = post.get('score', 0)
+        if 'comment_count' in self.content_columns: row['comment_count'] = post.get('num_comments', 0)
+        if 'category' in self.content_columns: row['category'] = 'other'
         
         # Store author and external URL in editorial note
         note_parts = [f"Author: u/{post.get('author', 'unknown')}"]
@@ -229,12 +237,20 @@ class RedditDatabaseManager:
             note_parts.append(f"Link: {post['external_url']}")
         
         if 'editorial_note' in self.content_columns: 
-            cols.append('editorial_note')
-            vals.append(' | '.join(note_parts))
+            row['editorial_note'] = ' | '.join(note_parts)
+        return row
+    
+    def save_post(self, post, creator_id):
+        return self.save_posts([(post, creator_id)]).get(post['url'])
+    
+    def save_posts(self, entries):
+        """Insert many posts in one transaction ([(post, creator_id)]).
         
-        self.cursor.execute(f"INSERT INTO content_items ({','.join(cols)}) VALUES ({','.join(['%s']*len(vals))}) RETURNING id", vals)
-        self.conn.commit()
-        return self.cursor.fetchone()['id']
+        A failed batch is retried row by row, so a bad row only loses itself.
+        Returns {url: id} for the posts inserted (existing urls are skipped).
+        """
+        rows = [self._post_row(post, creator_id) for post, creator_id in entries]
+        return save_content_items(self.conn, self.cursor, rows)
 
 
 def is_hyrox_relevant(post):
@@ -242,15 +258,22 @@ def is_hyrox_relevant(post):
     return any(kw in text for kw in HYROX_KEYWORDS)
 
 
-def main():
+def main(week_start=None, week_end=None):
+    """Run Reddit discovery and return a summary dict (found/saved/skipped)
+
+    week_end is exclusive; anything left as None falls back to the environment.
+    """
+    week_start = week_start or WEEK_START
+    week_end = week_end or WEEK_END
+
     print("=" * 70)
     print("REDDIT DISCOVERY - Hyrox Content")
     print("=" * 70)
     
-    print(f"\n📅 Week: {WEEK_START.strftime('%Y-%m-%d')} to {WEEK_END.strftime('%Y-%m-%d')}")
+    print(f"\n📅 Week: {week_start.strftime('%Y-%m-%d')} to {week_end.strftime('%Y-%m-%d')}")
     
     # Check if we're looking for historical posts (more than a few days ago)
-    days_ago = (datetime.now() - WEEK_END).days
+    days_ago = (datetime.now() - week_end).days
     is_historical = days_ago > 3
     
     if is_historical:
@@ -299,8 +322,8 @@ def main():
     print(f"   {len(unique)} unique posts after deduplication")
     
     # Filter to selected week
-    recent = [p for p in unique if WEEK_START <= p.get('published_date', datetime.now()) <= WEEK_END]
-    print(f"   📅 {len(recent)} posts from selected week ({WEEK_START.strftime('%b %d')} - {WEEK_END.strftime('%b %d')})")
+    recent = [p for p in unique if week_start <= p.get('published_date', datetime.now()) <= week_end]
+    print(f"   📅 {len(recent)} posts from selected week ({week_start.strftime('%b %d')} - {week_end.strftime('%b %d')})")
     
     if len(recent) == 0 and len(unique) > 0:
         # Show what date range we actually got
@@ -318,20 +341,28 @@ def main():
     db.connect()
     
     saved, skipped = 0, 0
+    to_save = []
+    already_saved = db.existing_urls([post['url'] for post in recent])
     for post in recent:
-        if db.post_exists(post['url']):
+        if post['url'] in already_saved:
             skipped += 1
             continue
         
         creator_id = db.get_or_create_creator(post['source'], post.get('author', ''))
-        
-        try:
-            db.save_post(post, creator_id)
-            saved += 1
-            score = post.get('score', 0)
-            print(f"   ✅ Saved: [{score} pts] {post['title'][:45]}...")
-        except Exception as e:
-            print(f"   ❌ Error: {e}")
+        to_save.append((post, creator_id))
+    
+    # Write the whole batch in one transaction
+    try:
+        inserted = db.save_posts(to_save)
+        for post, _ in to_save:
+            if post['url'] in inserted:
+                saved += 1
+                score = post.get('score', 0)
+                print(f"   ✅ Saved: [{score} pts] {post['title'][:45]}...")
+            else:
+                skipped += 1
+    except Exception as e:
+        print(f"   ❌ Error: {e}")
     
     db.close()
     
@@ -339,6 +370,8 @@ def main():
     print(f"Reddit discovery complete! Saved: {saved}, Skipped: {skipped}")
     print("=" * 70)
 
+    return {'found': len(recent), 'saved': saved, 'skipped': skipped}
+
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,246 @@
+"""
+Hyrox Weekly - Supabase REST Client
+
+Thin PostgREST client on a persistent keep-alive session (see http_client).
+
+Reads never come back silently truncated by the server's max-rows cap: they are
+paged with Range headers until the table is exhausted, either collected into a
+list (get) or streamed page by page (iter_rows). Row counts use
+`Prefer: count=exact` and transfer no rows.
+
+Usage:
+    from supabase_client import SupabaseClient
+
+    db = SupabaseClient(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+    items = db.get('content_items', 'select=id,title&status=eq.selected')
+    for row in db.iter_rows('content_items', 'select=platform,status'):
+        ...
+    total = db.count('content_items', 'status=eq.discovered')
+    counts = db.rpc('content_counts', {'p_start': '2025-01-06', 'p_end': '2025-01-13'})
+    db.insert_many('athletes', rows)
+    deleted = db.delete_where('content_items', 'platform=eq.reddit&select=id')
+"""
+
+from urllib.parse import parse_qs
+
+import http_client
+
+# Rows requested per Range page (PostgREST's default max-rows is 1000)
+PAGE_SIZE = 1000
+
+# Unique column appended to order= when paging, so rows can't shift between pages.
+# Tables not listed here use 'id'.
+ORDER_TIEBREAKERS = {
+    'newsletter_settings': 'key',
+    'premium_settings': 'key',
+}
+
+# Rows per JSON-array insert/upsert request
+WRITE_CHUNK_SIZE = 500
+
+# Values per id=in.(...) filter, to keep URLs well under server limits
+FILTER_CHUNK_SIZE = 200
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _parse_content_range(value):
+    """'0-999/5321' -> 5321; None when the total is unknown ('*')"""
+    if not value or '/' not in value:
+        return None
+    total = value.rsplit('/', 1)[1]
+    return int(total) if total.isdigit() else None
+
+
+def _with_tiebreaker(params, column):
+    """Make params' order= end with a unique column (adding order= if missing)"""
+    parts = params.split('&') if params else []
+    for i, part in enumerate(parts):
+        if part.startswith('order='):
+            ordered = [term.split('.')[0] for term in part[len('order='):].split(',')]
+            if column not in ordered:
+                parts[i] = f"{part},{column}"
+            return '&'.join(parts)
+    parts.append(f"order={column}")
+    return '&'.join(parts)
+
+
+class SupabaseClient:
+    """PostgREST calls for one project/key, with transparent range pagination"""
+
+    def __init__(self, url, key, page_size=PAGE_SIZE):
+        self.base_url = f"{url.rstrip('/')}/rest/v1"
+        self.key = key
+        self.page_size = page_size
+
+    def headers(self, prefer='return=representation', **extra):
+        headers = {
+            'apikey': self.key,
+            'Authorization': f'Bearer {self.key}',
+            'Content-Type': 'application/json',
+        }
+        if prefer:
+            headers['Prefer'] = prefer
+        headers.update(extra)
+        return headers
+
+    def _url(self, table, params=None):
+        url = f"{self.base_url}/{table}"
+        return f"{url}?{params}" if params else url
+
+    def get_page(self, table, params=None, offset=0, limit=None, count=False):
+        """One Range page of rows.
+
+        Returns:
+            (rows, total) - total is the exact row count when count=True, else
+            whatever the server reported (often None)
+        """
+        limit = limit or self.page_size
+        headers = self.headers(
+            prefer='count=exact' if count else None,
+            **{'Range-Unit': 'items', 'Range': f'{offset}-{offset + limit - 1}'}
+        )
+        response = http_client.get(self._url(table, params), headers=headers)
+        if response.status_code not in (200, 206):
+            raise RuntimeError(f"Supabase GET {table} failed: {response.status_code} - {response.text}")
+        return response.json(), _parse_content_range(response.headers.get('Content-Range'))
+
+    def iter_rows(self, table, params=None, page_size=None):
+        """Yield every matching row, fetching one Range page at a time.
+
+        The order is made unique (see ORDER_TIEBREAKERS) so offset pages are stable.
+        """
+        page_size = page_size or self.page_size
+        params = _with_tiebreaker(params, ORDER_TIEBREAKERS.get(table, 'id'))
+        offset = 0
+        while True:
+            rows, total = self.get_page(table, params, offset, page_size)
+            yield from rows
+            offset += len(rows)
+            # A short page isn't the end: the server's max-rows may be below our page size
+            if not rows or (total is not None and offset >= total):
+                break
+
+    def get(self, table, params=None, single=False):
+        """All matching rows as a list (or the first row / None with single=True).
+
+        Queries with an explicit limit= are sent as a single request.
+        """
+        if single or 'limit' in parse_qs(params or ''):
+            response = http_client.get(self._url(table, params), headers=self.headers(prefer=None))
+            if response.status_code != 200:
+                raise RuntimeError(f"Supabase GET {table} failed: {response.status_code} - {response.text}")
+            rows = response.json()
+        else:
+            rows = list(self.iter_rows(table, params))
+        if single:
+            return rows[0] if rows else None
+        return rows
+
+    def count(self, table, params=None):
+        """Exact number of matching rows, without transferring them"""
+        response = http_client.request(
+            'HEAD', self._url(table, params),
+            headers=self.headers(prefer='count=exact', **{'Range-Unit': 'items', 'Range': '0-0'})
+        )
+        if response.status_code not in (200, 206):
+            raise RuntimeError(f"Supabase count {table} failed: {response.status_code}")
+        return _parse_content_range(response.headers.get('Content-Range')) or 0
+
+    def rpc(self, function, args=None):
+        """Call a Postgres function through POST /rpc/<function>; returns its JSON result"""
+        response = http_client.post(f"{self.base_url}/rpc/{function}", headers=self.headers(prefer=None), json=args or {})
+        if response.status_code != 200:
+            raise RuntimeError(f"Supabase RPC {function} failed: {response.status_code} - {response.text}")
+        return response.json()
+
+    def _result(self, response, action, table):
+        if response.status_code not in (200, 201, 204):
+            raise RuntimeError(f"Supabase {action} {table} failed: {response.status_code} - {response.text}")
+        if not response.text:
+            return True
+        result = response.json()
+        return result[0] if isinstance(result, list) and result else result
+
+    def post(self, table, data):
+        """Insert row(s); returns the first inserted row"""
+        response = http_client.post(self._url(table), headers=self.headers(), json=data)
+        return self._result(response, 'POST', table)
+
+    def patch(self, table, params, data):
+        """Update matching rows; returns the first updated row (or True)"""
+        response = http_client.patch(self._url(table, params), headers=self.headers(), json=data)
+        return self._result(response, 'PATCH', table)
+
+    def delete(self, table, params):
+        response = http_client.delete(self._url(table, params), headers=self.headers())
+        return response.status_code in (200, 204)
+
+    def upsert(self, table, data, on_conflict=None):
+        """Insert or merge row(s) on the on_conflict columns; returns the first row"""
+        prefer = 'resolution=merge-duplicates,return=representation' if on_conflict else 'return=representation'
+        url = self._url(table, f"on_conflict={on_conflict}" if on_conflict else None)
+        response = http_client.post(url, headers=self.headers(prefer=prefer), json=data)
+        return self._result(response, 'UPSERT', table)
+
+    def insert_many(self, table, rows, on_conflict=None, chunk_size=WRITE_CHUNK_SIZE):
+        """Insert rows as JSON-array POSTs of chunk_size rows each.
+
+        With on_conflict, rows are upserted (merged) on those columns instead.
+        Rows may have different keys; missing columns get their defaults.
+
+        Returns:
+            List of all rows written
+        """
+        rows = list(rows)
+        if not rows:
+            return []
+        columns = list(dict.fromkeys(key for row in rows for key in row))
+        params = f"columns={','.join(columns)}"
+        prefer = 'return=representation,missing=default'
+        if on_conflict:
+            params += f"&on_conflict={on_conflict}"
+            prefer = 'resolution=merge-duplicates,' + prefer
+
+        written = []
+        for chunk in _chunks(rows, chunk_size):
+            response = http_client.post(self._url(table, params), headers=self.headers(prefer=prefer), json=chunk)
+            if response.status_code not in (200, 201):
+                raise RuntimeError(f"Supabase bulk insert {table} failed: {response.status_code} - {response.text}")
+            written.extend(response.json())
+        return written
+
+    def upsert_many(self, table, rows, on_conflict, chunk_size=WRITE_CHUNK_SIZE):
+        """Upsert rows in chunked JSON-array requests; returns all rows written"""
+        return self.insert_many(table, rows, on_conflict=on_conflict, chunk_size=chunk_size)
+
+    def delete_where(self, table, params):
+        """Delete every row matching a filter in one request.
+
+        Put a narrow select= in params (e.g. 'select=id') to keep the response small.
+
+        Returns:
+            The deleted rows (as selected)
+        """
+        if not params or not any(k != 'select' for k in parse_qs(params)):
+            raise ValueError(f"Refusing to delete from {table} without a filter")
+        response = http_client.delete(self._url(table, params), headers=self.headers())
+        if response.status_code not in (200, 204):
+            raise RuntimeError(f"Supabase DELETE {table} failed: {response.status_code} - {response.text}")
+        return response.json() if response.text else []
+
+    def delete_in(self, table, column, values, chunk_size=FILTER_CHUNK_SIZE):
+        """Delete rows whose `column` is in `values`, chunked into column=in.(...) filters.
+
+        Returns:
+            Number of rows deleted
+        """
+        values = list(dict.fromkeys(values))
+        deleted = 0
+        for chunk in _chunks(values, chunk_size):
+            in_list = ','.join(str(v) for v in chunk)
+            deleted += len(self.delete_where(table, f"{column}=in.({in_list})&select={column}"))
+        return deleted
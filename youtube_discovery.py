@@ -5,12 +5,18 @@ Searches for Hyrox content and stores in database
 
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
 import psycopg2
 from psycopg2.extras import RealDictCursor
 import os
+import re
+import xml.etree.ElementTree as ET
 from dateutil import parser as date_parser
+from db_bulk import insert_rows, save_content_items
+from disk_cache import DiskCache, MISSING
+from youtube_quota import QuotaExceeded, get_ledger, paginated_search
+from feed_cache import fetch_feed
 
 load_dotenv()
 
@@ -32,6 +38,28 @@ MIN_DURATION_SECONDS = int(os.getenv('YOUTUBE_MIN_DURATION', '60'))
 # Options: 'US', 'GB', 'DE', 'AU', or '' for no region filter
 YOUTUBE_REGION = os.getenv('YOUTUBE_REGION', '')  # Default to no region filter
 
+# Search pagination: results wanted per run, and the most quota units the main search may spend.
+# Defaults to one page (same quota as before); raise both to page deeper.
+YOUTUBE_SEARCH_MAX_RESULTS = int(os.getenv('YOUTUBE_SEARCH_MAX_RESULTS', '50'))
+YOUTUBE_SEARCH_BUDGET_UNITS = int(os.getenv('YOUTUBE_SEARCH_BUDGET_UNITS', '100'))
+
+# Public per-channel RSS (latest ~15 uploads, no API quota)
+CHANNEL_RSS_URL = 'https://www.youtube.com/feeds/videos.xml?channel_id={}'
+CHANNEL_RSS_MAX_ENTRIES = 15
+UPLOADS_MAX_PAGES = 4
+
+RSS_NS = {
+    'atom': 'http://www.w3.org/2005/Atom',
+    'yt': 'http://www.youtube.com/xml/schemas/2015',
+    'media': 'http://search.yahoo.com/mrss/',
+}
+
+# Channel info in the creators table younger than this is reused instead of calling channels.list
+CHANNEL_INFO_MAX_AGE = timedelta(days=int(os.getenv('YOUTUBE_CHANNEL_MAX_AGE_DAYS', '7')))
+
+# How long list-response ETags are kept for conditional requests (seconds)
+ETAG_CACHE_TTL = 7 * 86400
+
 # Configuration
 YOUTUBE_API_KEY = os.getenv('YOUTUBE_API_KEY')
 DB_CONFIG = {
@@ -43,9 +71,16 @@ DB_CONFIG = {
 }
 
 class YouTubeDiscovery:
-    def __init__(self):
+    def __init__(self, week_start=None, week_end=None, min_duration=None, region=None):
+        """Settings default to the environment-derived module values when not given"""
         self.youtube = build('youtube', 'v3', developerKey=YOUTUBE_API_KEY)
         self.conn = None
+        self.week_start = week_start or WEEK_START
+        self.week_end = week_end or WEEK_END
+        self.min_duration = MIN_DURATION_SECONDS if min_duration is None else min_duration
+        self.region = YOUTUBE_REGION if region is None else region
+        self.etag_cache = DiskCache('youtube_etags')
+        self.quota = get_ledger()
     
     def connect_db(self):
         """Connect to database"""
@@ -59,14 +94,14 @@ class YouTubeDiscovery:
         Args:
             max_results: Maximum number of results to return
         """
-        # Use the global week range
-        published_after = WEEK_START.isoformat() + 'Z'
-        published_before = WEEK_END.isoformat() + 'Z'
-        
-        print(f"📅 Week: {WEEK_START.strftime('%Y-%m-%d')} to {WEEK_END.strftime('%Y-%m-%d')}")
-        print(f"⏱️ Minimum duration: {MIN_DURATION_SECONDS} seconds")
-        if YOUTUBE_REGION:
-            print(f"🌍 Region filter: {YOUTUBE_REGION}")
+        # Use this run's week range
+        published_after = self.week_start.isoformat() + 'Z'
+        published_before = self.week_end.isoformat() + 'Z'
+        
+        print(f"📅 Week: {self.week_start.strftime('%Y-%m-%d')} to {self.week_end.strftime('%Y-%m-%d')}")
+        print(f"⏱️ Minimum duration: {self.min_duration} seconds")
+        if self.region:
+            print(f"🌍 Region filter: {self.region}")
         else:
             print(f"🌍 Region filter: Global (no region bias)")
         print(f"\n🔍 Searching YouTube for 'Hyrox' videos (English only)...")
@@ -77,7 +112,6 @@ class YouTubeDiscovery:
                 'q': 'Hyrox',
                 'type': 'video',
                 'part': 'id,snippet',
-                'maxResults': max_results,
                 'publishedAfter': published_after,
                 'publishedBefore': published_before,
                 'order': 'viewCount',
@@ -85,55 +119,174 @@ class YouTubeDiscovery:
             }
             
             # Only add regionCode if specified (empty = global/unbiased)
-            if YOUTUBE_REGION:
-                search_params['regionCode'] = YOUTUBE_REGION
+            if self.region:
+                search_params['regionCode'] = self.region
             
-            search_response = self.youtube.search().list(**search_params).execute()
-            
-            videos = search_response.get('items', [])
+            # Follows nextPageToken within the run's search budget and today's quota
+            videos = paginated_search(self.youtube, search_params, max_results,
+                                      budget_units=YOUTUBE_SEARCH_BUDGET_UNITS, ledger=self.quota)
             print(f"   ✅ Found {len(videos)} videos")
             
             return videos
             
+        except QuotaExceeded as e:
+            print(f"   ⛔ Skipping search: {e}")
+            return []
         except HttpError as e:
             print(f"   ❌ YouTube API error: {e}")
             return []
     
-    def search_channel_videos(self, channel_name, channel_id=None, max_results=10):
+    def resolve_priority_channel(self, source):
         """
-        Search for recent videos from a specific channel
+        Resolve a priority source to its channel ID
         
-        Args:
-            channel_name: Name of the channel to search
-            channel_id: YouTube channel ID (if available, more accurate)
-            max_results: Maximum number of results
+        Uses source_id or a /channel/ URL when present, then a @handle
+        (channels.list, 1 unit), and only as a last resort a channel search
+        (100 units). Resolved IDs are written back to priority_sources so each
+        channel is only looked up once.
         """
-        published_after = WEEK_START.isoformat() + 'Z'
-        published_before = WEEK_END.isoformat() + 'Z'
+        source_id = source.get('source_id') or ''
+        if source_id.startswith('UC'):
+            return source_id
+        
+        source_url = source.get('source_url') or ''
+        match = re.search(r'/channel/(UC[\w-]+)', source_url)
+        if match:
+            return self._remember_priority_channel(source, match.group(1))
+        
+        handle = None
+        match = re.search(r'/@([\w.-]+)', source_url)
+        if match:
+            handle = match.group(1)
+        elif source['source_name'].startswith('@'):
+            handle = source['source_name'][1:]
         
         try:
-            # Build search params
-            search_params = {
-                'type': 'video',
-                'part': 'id,snippet',
-                'maxResults': max_results,
-                'publishedAfter': published_after,
-                'publishedBefore': published_before,
-                'order': 'date',
-            }
-            
-            # If we have a channel ID, use it for precise results
-            if channel_id:
-                search_params['channelId'] = channel_id
+            if handle:
+                response = self.quota.execute(
+                    self.youtube.channels().list(part='id', forHandle=handle), 'channels.list'
+                )
             else:
-                # Fall back to searching by channel name
-                search_params['q'] = channel_name
+                response = self.quota.execute(self.youtube.search().list(
+                    q=source['source_name'], type='channel', part='id', maxResults=1
+                ), 'search.list')
+        except HttpError as e:
+            print(f"   ❌ Could not resolve channel '{source['source_name']}': {e}")
+            return None
+        
+        items = response.get('items', [])
+        if not items:
+            return None
+        channel_id = items[0]['id'] if handle else items[0]['id'].get('channelId')
+        return self._remember_priority_channel(source, channel_id)
+    
+    def _remember_priority_channel(self, source, channel_id):
+        if channel_id and source.get('id'):
+            try:
+                conn = psycopg2.connect(**DB_CONFIG)
+                cursor = conn.cursor()
+                cursor.execute("""
+                    UPDATE priority_sources SET source_id = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s
+                """, (channel_id, source['id']))
+                conn.commit()
+                cursor.close()
+                conn.close()
+            except Exception as e:
+                print(f"   ⚠️ Could not save channel ID for '{source['source_name']}': {e}")
+        return channel_id
+    
+    def _published_utc(self, published):
+        """Naive UTC datetime, comparable with the run's week range"""
+        published = date_parser.parse(published)
+        if published.tzinfo:
+            published = published.astimezone(timezone.utc).replace(tzinfo=None)
+        return published
+    
+    def _in_week(self, published):
+        return self.week_start <= self._published_utc(published) <= self.week_end
+    
+    def _parse_channel_rss(self, content):
+        """Convert a channel's Atom feed into search.list-shaped items"""
+        root = ET.fromstring(content)
+        items = []
+        for entry in root.findall('atom:entry', RSS_NS):
+            video_id = entry.findtext('yt:videoId', '', RSS_NS)
+            thumbnail = entry.find('media:group/media:thumbnail', RSS_NS)
+            thumbnail_url = thumbnail.get('url') if thumbnail is not None else f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"
+            items.append({
+                'id': {'videoId': video_id},
+                'snippet': {
+                    'title': entry.findtext('atom:title', '', RSS_NS),
+                    'description': entry.findtext('media:group/media:description', '', RSS_NS),
+                    'channelId': entry.findtext('yt:channelId', '', RSS_NS),
+                    'channelTitle': entry.findtext('atom:author/atom:name', '', RSS_NS),
+                    'publishedAt': entry.findtext('atom:published', '', RSS_NS),
+                    'thumbnails': {'high': {'url': thumbnail_url}},
+                },
+            })
+        return items
+    
+    def _uploads_playlist_videos(self, channel_id):
+        """Walk the channel's uploads playlist (1 unit per page) back to the start of the week"""
+        playlist_id = 'UU' + channel_id[2:]
+        videos = []
+        page_token = None
+        for _ in range(UPLOADS_MAX_PAGES):
+            params = {'part': 'snippet,contentDetails', 'playlistId': playlist_id, 'maxResults': 50}
+            if page_token:
+                params['pageToken'] = page_token
+            response = self.quota.execute(self.youtube.playlistItems().list(**params), 'playlistItems.list')
             
-            search_response = self.youtube.search().list(**search_params).execute()
-            return search_response.get('items', [])
+            reached_start = False
+            for item in response.get('items', []):
+                snippet = item['snippet']
+                published = item.get('contentDetails', {}).get('videoPublishedAt')
+                if not published:
+                    continue  # Private or deleted video
+                if self._published_utc(published) < self.week_start:
+                    reached_start = True
+                    continue
+                if not self._in_week(published):
+                    continue
+                thumbnails = snippet.get('thumbnails', {})
+                video_id = snippet['resourceId']['videoId']
+                videos.append({
+                    'id': {'videoId': video_id},
+                    'snippet': {
+                        'title': snippet.get('title', ''),
+                        'description': snippet.get('description', ''),
+                        'channelId': snippet.get('videoOwnerChannelId') or channel_id,
+                        'channelTitle': snippet.get('videoOwnerChannelTitle') or snippet.get('channelTitle', ''),
+                        'publishedAt': published,
+                        'thumbnails': {'high': thumbnails.get('high') or {'url': f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"}},
+                    },
+                })
             
+            page_token = response.get('nextPageToken')
+            if reached_start or not page_token:
+                break
+        return videos
+    
+    def get_channel_week_videos(self, channel_id):
+        """
+        This week's uploads for a channel
+        
+        Reads the public channel RSS feed (no quota). Only if the feed's ~15
+        entries don't reach back to the start of the week does it fall back to
+        the uploads playlist via playlistItems.list (1 unit per 50 videos).
+        """
+        try:
+            entries, _ = fetch_feed(CHANNEL_RSS_URL.format(channel_id), self._parse_channel_rss)
+            oldest = min((self._published_utc(e['snippet']['publishedAt']) for e in entries), default=None)
+            if len(entries) < CHANNEL_RSS_MAX_ENTRIES or (oldest and oldest <= self.week_start):
+                return [e for e in entries if self._in_week(e['snippet']['publishedAt'])]
+        except Exception as e:
+            print(f"      ⚠️ Channel RSS unavailable ({e}), using uploads playlist")
+        
+        try:
+            return self._uploads_playlist_videos(channel_id)
         except HttpError as e:
-            print(f"   ❌ Error searching channel '{channel_name}': {e}")
+            print(f"   ❌ Error reading uploads for {channel_id}: {e}")
             return []
     
     def get_priority_youtube_sources(self):
@@ -142,7 +295,7 @@ class YouTubeDiscovery:
             conn = psycopg2.connect(**DB_CONFIG)
             cursor = conn.cursor(cursor_factory=RealDictCursor)
             cursor.execute("""
-                SELECT source_name, source_id FROM priority_sources 
+                SELECT id, source_name, source_id, source_url FROM priority_sources 
                 WHERE platform = 'youtube' AND is_active = true
             """)
             sources = cursor.fetchall()
@@ -153,6 +306,21 @@ class YouTubeDiscovery:
             print(f"   ⚠️ Could not load priority sources: {e}")
             return []
     
+    def _execute_conditional(self, request, method, cache_key):
+        """Execute a list request with If-None-Match, reusing the stored response on 304"""
+        cached = self.etag_cache.get(cache_key)
+        if cached is not MISSING and cached.get('etag'):
+            request.headers['If-None-Match'] = cached['etag']
+        try:
+            response = self.quota.execute(request, method)
+        except HttpError as e:
+            if e.resp.status == 304 and cached is not MISSING:
+                return cached['response']
+            raise
+        if response.get('etag'):
+            self.etag_cache.set(cache_key, {'etag': response['etag'], 'response': response}, ttl=ETAG_CACHE_TTL)
+        return response
+    
     def get_video_statistics(self, video_ids):
         """
         Get detailed statistics for a list of video IDs
@@ -169,10 +337,11 @@ class YouTubeDiscovery:
             for i in range(0, len(video_ids), 50):
                 batch = video_ids[i:i+50]
                 
-                response = self.youtube.videos().list(
+                request = self.youtube.videos().list(
                     part='statistics,contentDetails,snippet',
                     id=','.join(batch)
-                ).execute()
+                )
+                response = self._execute_conditional(request, 'videos.list', 'videos:' + ','.join(sorted(batch)))
                 
                 for item in response.get('items', []):
                     video_id = item['id']
@@ -190,29 +359,69 @@ class YouTubeDiscovery:
             
             return stats
             
-        except HttpError as e:
+        except (HttpError, QuotaExceeded) as e:
             print(f"   ❌ Error fetching statistics: {e}")
             return {}
     
-    def get_channel_info(self, channel_id):
+    def get_channel_info(self, channel_id, cursor=None):
         """Get channel information"""
+        return self.get_channels_info([channel_id], cursor=cursor).get(channel_id)
+    
+    def get_fresh_channels(self, cursor, channel_ids):
+        """Channel info from the creators table, for channels refreshed within CHANNEL_INFO_MAX_AGE"""
+        cursor.execute("""
+            SELECT id, platform_id, name, follower_count, avatar_url
+            FROM creators
+            WHERE platform = 'youtube' AND platform_id = ANY(%s)
+            AND updated_at >= %s
+        """, (list(channel_ids), datetime.now() - CHANNEL_INFO_MAX_AGE))
+        
+        return {
+            row['platform_id']: {
+                'creator_id': row['id'],
+                'name': row['name'],
+                'subscriber_count': row['follower_count'] or 0,
+                'avatar_url': row['avatar_url'],
+            }
+            for row in cursor.fetchall()
+        }
+    
+    def get_channels_info(self, channel_ids, cursor=None):
+        """
+        Get channel information for many channels
+        
+        Channels with fresh rows in the creators table (needs cursor) are served
+        from the database; the rest are fetched 50 per channels.list call with
+        ETag-conditional requests.
+        
+        Returns:
+            {channel_id: info}; info has 'creator_id' when it came from the database
+        """
+        channel_ids = list(dict.fromkeys(c for c in channel_ids if c))
+        channels = self.get_fresh_channels(cursor, channel_ids) if cursor and channel_ids else {}
+        to_fetch = [c for c in channel_ids if c not in channels]
+        
         try:
-            response = self.youtube.channels().list(
-                part='snippet,statistics',
-                id=channel_id
-            ).execute()
-            
-            if response.get('items'):
-                channel = response['items'][0]
-                return {
-                    'name': channel['snippet']['title'],
-                    'subscriber_count': int(channel['statistics'].get('subscriberCount', 0)),
-                    'avatar_url': channel['snippet']['thumbnails']['default']['url']
-                }
-        except HttpError as e:
+            for i in range(0, len(to_fetch), 50):
+                batch = to_fetch[i:i+50]
+                request = self.youtube.channels().list(
+                    part='snippet,statistics',
+                    id=','.join(batch)
+                )
+                response = self._execute_conditional(request, 'channels.list', 'channels:' + ','.join(sorted(batch)))
+                
+                for channel in response.get('items', []):
+                    channels[channel['id']] = {
+                        'name': channel['snippet']['title'],
+                        'subscriber_count': int(channel['statistics'].get('subscriberCount', 0)),
+                        'avatar_url': channel['snippet']['thumbnails']['default']['url']
+                    }
+        except (HttpError, QuotaExceeded) as e:
             print(f"✗ Error fetching channel info: {e}")
         
-        return None
+        if channel_ids:
+            print(f"   📺 Channels: {len(channel_ids) - len(to_fetch)} from database, {len(to_fetch)} fetched")
+        return channels
     
     def parse_duration(self, duration_str):
         """Convert ISO 8601 duration to seconds (PT1H2M10S -> 3730)"""
@@ -233,77 +442,71 @@ class YouTubeDiscovery:
         """Save or update creator in database"""
         if not channel_info:
             return None
+        return self.save_creators(cursor, {channel_id: channel_info}).get(channel_id)
+    
+    def save_creators(self, cursor, channels):
+        """Upsert fetched channels in one statement; returns {channel_id: creator_id}
         
-        cursor.execute("""
-            INSERT INTO creators (name, platform, platform_id, follower_count, avatar_url)
-            VALUES (%s, %s, %s, %s, %s)
-            ON CONFLICT (platform, platform_id) 
-            DO UPDATE SET 
+        Channels served from the creators table are already up to date and just
+        reuse their creator_id.
+        """
+        creator_ids = {cid: info['creator_id'] for cid, info in channels.items() if info.get('creator_id')}
+        rows = [
+            {
+                'name': info['name'],
+                'platform': 'youtube',
+                'platform_id': cid,
+                'follower_count': info['subscriber_count'],
+                'avatar_url': info['avatar_url'],
+            }
+            for cid, info in channels.items() if not info.get('creator_id')
+        ]
+        result = insert_rows(cursor, 'creators', rows, conflict="""(platform, platform_id)
+            DO UPDATE SET
                 follower_count = EXCLUDED.follower_count,
-                updated_at = CURRENT_TIMESTAMP
-            RETURNING id;
-        """, (
-            channel_info['name'],
-            'youtube',
-            channel_id,
-            channel_info['subscriber_count'],
-            channel_info['avatar_url']
-        ))
-        
-        result = cursor.fetchone()
-        return result['id'] if result else None
+                updated_at = CURRENT_TIMESTAMP""", returning="id, platform_id")
+        creator_ids.update({row['platform_id']: row['id'] for row in result})
+        return creator_ids
     
-    def save_content(self, cursor, video, stats, creator_id):
-        """Save video content to database"""
+    def content_row(self, video, stats, creator_id):
+        """Build the content_items row for a video"""
         snippet = video['snippet']
         video_id = video['id']['videoId']
-        url = f"https://www.youtube.com/watch?v={video_id}"
-        
-        # Parse published date
-        published_date = date_parser.parse(snippet['publishedAt'])
-        
-        # Get statistics
-        view_count = stats.get('view_count', 0)
-        like_count = stats.get('like_count', 0)
-        comment_count = stats.get('comment_count', 0)
-        duration_seconds = self.parse_duration(stats.get('duration', 'PT0S'))
-        
-        # Check if already exists
-        cursor.execute("""
-            SELECT id FROM content_items WHERE url = %s;
-        """, (url,))
         
-        if cursor.fetchone():
-            print(f"  ⊙ Already exists: {snippet['title'][:50]}...")
-            return None
+        return {
+            'creator_id': creator_id,
+            'url': f"https://www.youtube.com/watch?v={video_id}",
+            'title': snippet['title'],
+            'description': snippet['description'][:1000],  # Truncate long descriptions
+            'platform': 'youtube',
+            'content_type': 'video',
+            'published_date': date_parser.parse(snippet['publishedAt']),
+            'duration_seconds': self.parse_duration(stats.get('duration', 'PT0S')),
+            'thumbnail_url': snippet['thumbnails']['high']['url'],
+            'view_count': stats.get('view_count', 0),
+            'like_count': stats.get('like_count', 0),
+            'comment_count': stats.get('comment_count', 0),
+            'status': 'discovered',
+        }
+    
+    def save_content(self, cursor, video, stats, creator_id):
+        """Save video content to database"""
+        row = self.content_row(video, stats, creator_id)
+        return self.save_contents(cursor, [row]).get(row['url'])
+    
+    def save_contents(self, cursor, rows):
+        """Insert many video rows at once; existing urls are skipped (ON CONFLICT (url))
         
-        # Insert new content
-        cursor.execute("""
-            INSERT INTO content_items 
-            (creator_id, url, title, description, platform, content_type,
-             published_date, duration_seconds, thumbnail_url,
-             view_count, like_count, comment_count, status)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            RETURNING id;
-        """, (
-            creator_id,
-            url,
-            snippet['title'],
-            snippet['description'][:1000],  # Truncate long descriptions
-            'youtube',
-            'video',
-            published_date,
-            duration_seconds,
-            snippet['thumbnails']['high']['url'],
-            view_count,
-            like_count,
-            comment_count,
-            'discovered'
-        ))
-        
-        result = cursor.fetchone()
-        print(f"  ✓ Saved: {snippet['title'][:50]}... ({view_count:,} views)")
-        return result['id'] if result else None
+        Commits; a failed batch is retried row by row, so a bad row only loses itself.
+        Returns {url: id} for the videos inserted.
+        """
+        inserted = save_content_items(self.conn, cursor, rows)
+        for row in rows:
+            if row['url'] in inserted:
+                print(f"  ✓ Saved: {row['title'][:50]}... ({row['view_count']:,} views)")
+            else:
+                print(f"  ⊙ Already exists: {row['title'][:50]}...")
+        return inserted
     
     def discover_and_save(self, max_results=50):
         """Main function: discover videos and save to database"""
@@ -320,9 +523,16 @@ class YouTubeDiscovery:
             print(f"\n⭐ Checking {len(priority_sources)} priority YouTube channels...")
             for source in priority_sources:
                 channel_name = source['source_name']
-                channel_id = source.get('source_id')  # May be None
-                print(f"   ⭐ Searching: '{channel_name}'{'  (ID: ' + channel_id + ')' if channel_id else ''}...")
-                channel_videos = self.search_channel_videos(channel_name, channel_id=channel_id, max_results=10)
+                try:
+                    channel_id = self.resolve_priority_channel(source)
+                    if not channel_id:
+                        print(f"   ⚠️ Could not find channel '{channel_name}'")
+                        continue
+                    print(f"   ⭐ Checking: '{channel_name}' (ID: {channel_id})...")
+                    channel_videos = self.get_channel_week_videos(channel_id)
+                except QuotaExceeded as e:
+                    print(f"   ⛔ Skipping remaining priority channels: {e}")
+                    break
                 if channel_videos:
                     print(f"      Found {len(channel_videos)} videos")
                     videos.extend(channel_videos)
@@ -340,7 +550,7 @@ class YouTubeDiscovery:
         
         if not videos:
             print("No videos found for selected week.")
-            return
+            return {'found': 0, 'saved': 0, 'skipped': 0}
         
         # Get video IDs
         video_ids = [v['id']['videoId'] for v in videos]
@@ -366,7 +576,7 @@ class YouTubeDiscovery:
                 continue
             
             # Check minimum duration
-            if duration_seconds < MIN_DURATION_SECONDS:
+            if duration_seconds < self.min_duration:
                 too_short_count += 1
                 continue
             
@@ -375,53 +585,54 @@ class YouTubeDiscovery:
         if non_english_count > 0:
             print(f"   🌐 Filtered out {non_english_count} non-English videos")
         if too_short_count > 0:
-            print(f"   ⏱️ Filtered out {too_short_count} videos shorter than {MIN_DURATION_SECONDS} seconds")
+            print(f"   ⏱️ Filtered out {too_short_count} videos shorter than {self.min_duration} seconds")
         print(f"   ✅ {len(filtered_videos)} videos to process")
         
         if not filtered_videos:
             print("No videos found matching criteria for selected week.")
-            return
+            return {'found': 0, 'saved': 0, 'skipped': 0}
         
         # Connect to database
         cursor = self.connect_db()
         
         # Process each video
         print(f"\n💾 Processing {len(filtered_videos)} videos...\n")
-        saved_count = 0
-        skipped_count = 0
         
-        for video in filtered_videos:
-            video_id = video['id']['videoId']
-            channel_id = video['snippet']['channelId']
-            
-            # Get channel info
-            channel_info = self.get_channel_info(channel_id)
+        try:
+            # Channel info once per channel (database first, then batched API calls)
+            channels = self.get_channels_info([v['snippet']['channelId'] for v in filtered_videos], cursor=cursor)
+            creator_ids = self.save_creators(cursor, channels)
             
-            # Save creator
-            creator_id = self.save_creator(cursor, channel_id, channel_info)
+            rows = []
             
-            # Save content
-            stats = video_stats.get(video_id, {})
-            content_id = self.save_content(cursor, video, stats, creator_id)
+            for video in filtered_videos:
+                video_id = video['id']['videoId']
+                creator_id = creator_ids.get(video['snippet']['channelId'])
+                
+                # Stage content
+                stats = video_stats.get(video_id, {})
+                rows.append(self.content_row(video, stats, creator_id))
             
-            if content_id:
-                saved_count += 1
-            else:
-                skipped_count += 1
-        
-        # Commit changes
-        self.conn.commit()
-        cursor.close()
-        self.conn.close()
+            # Save all videos in one multi-row insert (commits)
+            inserted = self.save_contents(cursor, rows)
+            saved_count = len(inserted)
+            skipped_count = len(rows) - saved_count
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            self.conn.close()
         
         print("\n" + "="*70)
         print(f"✅ Discovery complete!")
         print(f"  - New videos saved: {saved_count}")
         print(f"  - Already in database: {skipped_count}")
         print(f"  - Total processed: {len(videos)}")
+        print(f"  - YouTube quota: {self.quota.summary()}")
         print("="*70 + "\n")
         
-        return saved_count
+        return {'found': len(filtered_videos), 'saved': saved_count, 'skipped': skipped_count}
     
     def log_discovery_run(self, cursor, platform, items_discovered, status, error_msg=None, exec_time=0):
         """Log discovery run to database"""
@@ -431,23 +642,25 @@ class YouTubeDiscovery:
             VALUES (%s, %s, %s, %s, %s);
         """, (platform, items_discovered, status, error_msg, exec_time))
 
-def main():
-    """Run YouTube discovery"""
+def main(week_start=None, week_end=None, min_duration=None, region=None):
+    """Run YouTube discovery and return a summary dict (found/saved/skipped)
+
+    week_end is exclusive; anything left as None falls back to the environment.
+    """
     # Check API key
     if not YOUTUBE_API_KEY:
         print("❌ Error: YOUTUBE_API_KEY not found in .env file")
         print("\nPlease add your YouTube API key to .env:")
         print("YOUTUBE_API_KEY=your-api-key-here")
-        return
+        raise ValueError("YOUTUBE_API_KEY not configured")
     
+    discovery = YouTubeDiscovery(week_start, week_end, min_duration, region)
+    return discovery.discover_and_save(max_results=YOUTUBE_SEARCH_MAX_RESULTS)
+
+if __name__ == "__main__":
     try:
-        discovery = YouTubeDiscovery()
-        discovery.discover_and_save(max_results=50)
-        
+        main()
     except Exception as e:
         print(f"\n❌ Error: {e}")
         import traceback
-        traceback.print_exc()
-
-if __name__ == "__main__":
-    main()
\ No newline at end of file
+        traceback.print_exc()
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""
+Hyrox Weekly - YouTube Quota Ledger
+
+Tracks YouTube Data API units spent per quota day (quota resets at midnight
+Pacific time), persisted in the shared disk cache so youtube_discovery.py,
+premium_discovery.py and the dashboard's manual search all draw from the
+same daily budget.
+
+Usage:
+    from youtube_quota import get_ledger, paginated_search, QuotaExceeded
+
+    ledger = get_ledger()
+    response = ledger.execute(youtube.videos().list(...), 'videos.list')
+    videos = paginated_search(youtube, search_params, max_results=150, budget_units=300)
+"""
+
+import math
+import os
+from datetime import datetime, timezone
+
+from disk_cache import DiskCache
+
+try:
+    from zoneinfo import ZoneInfo
+    QUOTA_TIMEZONE = ZoneInfo('America/Los_Angeles')
+except Exception:
+    QUOTA_TIMEZONE = timezone.utc
+
+# Units charged per call (https://developers.google.com/youtube/v3/determine_quota_cost)
+QUOTA_COSTS = {
+    'search.list': 100,
+    'videos.list': 1,
+    'channels.list': 1,
+    'playlistItems.list': 1,
+}
+
+DAILY_QUOTA = int(os.getenv('YOUTUBE_DAILY_QUOTA', '10000'))
+
+# Units a discovery run leaves untouched (for stats lookups and manual searches)
+QUOTA_RESERVE = int(os.getenv('YOUTUBE_QUOTA_RESERVE', '200'))
+
+SEARCH_PAGE_SIZE = 50
+
+
+class QuotaExceeded(Exception):
+    """Raised instead of making a call the remaining daily quota can't cover"""
+
+
+class QuotaLedger:
+    """Units spent today, shared across processes through the disk cache"""
+
+    def __init__(self, daily_quota=DAILY_QUOTA):
+        self.daily_quota = daily_quota
+        self.cache = DiskCache('youtube_quota')
+
+    def _day_key(self):
+        return datetime.now(QUOTA_TIMEZONE).strftime('%Y-%m-%d')
+
+    def spent(self):
+        return self.cache.get(self._day_key(), 0)
+
+    def remaining(self):
+        return max(0, self.daily_quota - self.spent())
+
+    def can_afford(self, units, reserve=0):
+        return self.remaining() - reserve >= units
+
+    def charge(self, method, calls=1):
+        """Record units for calls already made; returns total spent today"""
+        # Entries outlive the day by a margin so yesterday's total is still visible
+        return self.cache.incr(self._day_key(), QUOTA_COSTS.get(method, 1) * calls, ttl=3 * 86400)
+
+    def execute(self, request, method, reserve=0):
+        """Execute a googleapiclient request if the quota allows, charging it.
+
+        Failed calls are charged too (YouTube bills them).
+        """
+        cost = QUOTA_COSTS.get(method, 1)
+        if not self.can_afford(cost, reserve):
+            raise QuotaExceeded(
+                f"{method} needs {cost} units, {self.remaining()} of {self.daily_quota} left today"
+            )
+        try:
+            return request.execute()
+        finally:
+            self.charge(method)
+
+    def summary(self):
+        return f"{self.spent():,} / {self.daily_quota:,} units used today"
+
+
+_ledger = None
+
+
+def get_ledger():
+    global _ledger
+    if _ledger is None:
+        _ledger = QuotaLedger()
+    return _ledger
+
+
+def plan_search_pages(max_results, budget_units=None, ledger=None, reserve=QUOTA_RESERVE):
+    """How many search.list pages to fetch for max_results, within the run's budget
+    and what's left of today's quota (after `reserve`). Raises QuotaExceeded if none."""
+    ledger = ledger or get_ledger()
+    cost = QUOTA_COSTS['search.list']
+    pages = math.ceil(max_results / SEARCH_PAGE_SIZE)
+    if budget_units is not None:
+        pages = min(pages, budget_units // cost)
+    pages = min(pages, (ledger.remaining() - reserve) // cost)
+    if pages <= 0:
+        raise QuotaExceeded(f"No YouTube search budget left ({ledger.summary()})")
+    return pages
+
+
+def paginated_search(youtube, search_params, max_results, budget_units=None, ledger=None, reserve=QUOTA_RESERVE):
+    """search.list following nextPageToken until max_results, the page plan or the results run out.
+
+    If the quota only covers part of max_results the search is downgraded to
+    fewer pages (and says so) rather than failing mid-run.
+    """
+    ledger = ledger or get_ledger()
+    pages = plan_search_pages(max_results, budget_units, ledger, reserve)
+    wanted_pages = math.ceil(max_results / SEARCH_PAGE_SIZE)
+    if pages < wanted_pages:
+        print(f"   ⚠️ YouTube quota: fetching {pages} of {wanted_pages} result pages ({ledger.summary()})")
+
+    items = []
+    page_token = None
+    for _ in range(pages):
+        params = dict(search_params, maxResults=min(SEARCH_PAGE_SIZE, max_results - len(items)))
+        if page_token:
+            params['pageToken'] = page_token
+        response = ledger.execute(youtube.search().list(**params), 'search.list', reserve=reserve)
+        items.extend(response.get('items', []))
+        page_token = response.get('nextPageToken')
+        if not page_token or len(items) >= max_results:
+            break
+    return items